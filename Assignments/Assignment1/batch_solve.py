@@ -0,0 +1,174 @@
+"""Streaming batch solver for watering instances.
+
+Reads one instance per line from a JSONL file or stdin and writes one
+result per line as soon as it is known. An input line is either a game in
+the JSON form of solve_service.game_to_json, or an object
+
+    {"id": "map-17", "game": {...}, "algorithm": "gbfs", "optimal": 21}
+
+where everything but the game is optional; the id defaults to the line
+number, the algorithm to the --algorithm option. A result line is
+
+    {"id", "algorithm", "status", "plan", "length", "expanded", "seconds",
+     "valid", "optimal", "error"}
+
+with status solved, no solution, timeout or error, and valid telling
+whether ex1.check_plan accepts the plan. The algorithm 'portfolio' races
+the members of portfolio.default_members and keeps the first plan.
+
+Instances are solved in a process pool. The input is read lazily and at
+most 2 * workers lines are in flight, so memory does not grow with the
+size of the input. Results come out in completion order, or in input
+order with --ordered (which may hold back up to the in-flight window).
+
+    python batch_solve.py [INPUT|-] [--out FILE] [--algorithm NAME]
+                          [--workers N] [--deadline SECONDS] [--ordered]
+    python batch_solve.py --export [FILE]
+
+--export writes the ex1_check problems, with their optimal lengths, as an
+input file. --deadline limits each instance and runs it in a forked
+process of its own, like a one-member portfolio."""
+
+import concurrent.futures
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+import ex1
+import portfolio
+import solve_service
+
+ALGORITHMS = sorted(solve_service.ALGORITHMS) + ['portfolio']
+
+
+def solve_line(number, line, algorithm, deadline=None):
+    "Parse and solve one input line; always returns a result dict."
+    result = {"id": number, "algorithm": algorithm, "status": "error", "plan": None,
+              "length": None, "expanded": None, "seconds": None, "valid": None,
+              "optimal": None, "error": None}
+    start = time.time()
+    try:
+        # create_watering_problem prints, which would corrupt stdout output.
+        with contextlib.redirect_stdout(io.StringIO()):
+            _solve(result, number, line, algorithm, deadline)
+    except Exception as e:
+        result["error"] = repr(e)
+    result["seconds"] = time.time() - start
+    return result
+
+
+def _solve(result, number, line, algorithm, deadline):
+    "Fill in result for one input line."
+    data = json.loads(line)
+    if "game" in data:
+        result["id"] = data.get("id", number)
+        result["optimal"] = data.get("optimal")
+        algorithm = result["algorithm"] = data.get("algorithm", algorithm)
+        data = data["game"]
+    game = solve_service.game_from_json(data)
+    if algorithm == 'portfolio':
+        outcome = portfolio.run_portfolio(game, deadline=deadline)
+        status, plan = ('solved', outcome["plan"]) if outcome["plan"] is not None else (
+            'timeout' if any(m["status"] == 'cancelled' for m in outcome["members"].values())
+            else 'no solution', None)
+        if outcome["winner"] is not None:
+            result["expanded"] = outcome["members"][outcome["winner"]]["expanded"]
+    elif deadline is not None:
+        member = portfolio.Member(algorithm, solve_service.ALGORITHMS[algorithm])
+        outcome = portfolio.run_portfolio(game, [member], deadline=deadline)
+        report = outcome["members"][algorithm]
+        status, plan = {'won': 'solved', 'cancelled': 'timeout'}.get(
+            report["status"], report["status"]), outcome["plan"]
+        result["expanded"] = report["expanded"]
+    else:
+        status, plan, result["expanded"] = solve_service.solve(game, algorithm)
+    result.update(status=status, plan=plan)
+    if plan is not None:
+        result.update(length=len(plan), valid=ex1.check_plan(game, plan))
+
+
+def batch_solve(lines, out, algorithm='astar', workers=None, deadline=None, ordered=False):
+    """Solve the JSONL lines (any iterable of str) and write a result line
+    to out for each. Returns a dict of counts per status."""
+    workers = workers or os.cpu_count() or 1
+    window = 2 * workers
+    counts = {}
+    pending = {}
+    done = {}
+    next_out = 1
+
+    def emit(result):
+        if result is None:
+            return
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+    def collect(block):
+        nonlocal next_out
+        finished, _ = concurrent.futures.wait(
+            pending, return_when=concurrent.futures.FIRST_COMPLETED if block else
+            concurrent.futures.ALL_COMPLETED, timeout=None if block else 0)
+        for future in finished:
+            number = pending.pop(future)
+            if ordered:
+                done[number] = future.result()
+            else:
+                emit(future.result())
+        while next_out in done:
+            emit(done.pop(next_out))
+            next_out += 1
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        number = 0
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                # Blank lines keep their number but produce no result.
+                if ordered:
+                    done[number] = None
+                    collect(False)
+                continue
+            while len(pending) + len(done) >= window:
+                collect(True)
+            pending[pool.submit(solve_line, number, line, algorithm, deadline)] = number
+            collect(False)
+        while pending:
+            collect(True)
+    return counts
+
+
+def export(path):
+    "Write the ex1_check problems as batch input lines."
+    import ex1_check
+    with open(path, 'w') as f:
+        for name, game, optimal in ex1_check.all_problems():
+            f.write(json.dumps({"id": name, "game": solve_service.game_to_json(game),
+                                "optimal": optimal if optimal >= 0 else None}) + "\n")
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Solve JSONL watering instances in a pool.")
+    parser.add_argument('input', nargs='?', default='-', help="JSONL file, or - for stdin")
+    parser.add_argument('--out', metavar='FILE', help="result file (default: stdout)")
+    parser.add_argument('--algorithm', default='astar', choices=ALGORITHMS)
+    parser.add_argument('--workers', type=int, help="pool size (default: CPU count)")
+    parser.add_argument('--deadline', type=float, metavar='SECONDS',
+                        help="time limit per instance")
+    parser.add_argument('--ordered', action='store_true', help="write results in input order")
+    parser.add_argument('--export', nargs='?', const='ex1_check.jsonl', metavar='FILE',
+                        help="write the ex1_check problems as input lines and exit")
+    args = parser.parse_args()
+    if args.export is not None:
+        export(args.export)
+        sys.exit(0)
+    source = open(args.input) if args.input != '-' else sys.stdin
+    out = open(args.out, 'w') if args.out is not None else sys.stdout
+    start = time.time()
+    with source, out:
+        counts = batch_solve(source, out, args.algorithm, args.workers, args.deadline,
+                             args.ordered)
+    print("%s in %.1fs" % (counts, time.time() - start), file=sys.stderr)
@@ -0,0 +1,48 @@
+"""Beam search benchmark: solution length and time against beam width.
+
+Runs search.beam_search with growing widths on large generated maps with
+several robots and prints, per map, a text plot of the plan length for each
+width (with the GBFS plan length for reference where it finishes).
+
+    python bench_beam.py [width ...]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import ex1
+import generator
+import search
+
+SIZES = (10, 20, 30, 50)
+
+
+def solve(problem, width):
+    """(plan length or None, expanded, seconds, peak traced KiB)."""
+    tracemalloc.start()
+    start = time.time()
+    result = search.beam_search(problem, problem.h_gbfs, width, max_depth=2000)
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024.0
+    tracemalloc.stop()
+    if result is None:
+        return None, None, elapsed, peak
+    return result[0].path_cost, result[1], elapsed, peak
+
+
+if __name__ == '__main__':
+    widths = [int(a) for a in sys.argv[1:]] or [1, 2, 5, 10, 20, 50, 100, 200]
+    suite = generator.scaling_suite(sizes=SIZES, robots=4, taps=2, plants=4)
+    for name, game in suite:
+        problem = ex1.create_watering_problem(game)
+        rows = [(w,) + solve(problem, w) for w in widths]
+        longest = max([r[1] for r in rows if r[1] is not None] or [1])
+        print(name)
+        for width, length, expanded, elapsed, peak in rows:
+            if length is None:
+                print("  width %4d  %-40s  no plan    %6.2fs %9.1f KiB" % (width, "", elapsed, peak))
+                continue
+            bar = "#" * max(1, int(40 * length / longest))
+            print("  width %4d  %-40s %4d  expanded %7d  %6.2fs %9.1f KiB" %
+                  (width, bar, length, expanded, elapsed, peak))
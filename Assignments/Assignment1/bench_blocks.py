@@ -0,0 +1,159 @@
+"""Blocks-world scaling benchmark for the PDDL path.
+
+For every problem size, blocks_world writes a seeded random problem, and
+every search algorithm of search.py solves it in its own forked process
+with a time limit. The algorithms in BROKEN are skipped unless they are
+named with --algorithms. Each run parses and grounds the problem itself, so the
+grounding time is measured per run as well. One record per (n, algorithm)
+is appended to OUT.jsonl and the records of this run are written to
+OUT.csv. A record holds the status (ok, no plan, timeout or error),
+grounding and search seconds, expansions, plan length, task size and peak
+memory (the growth of the run's maximum resident set, in KiB).
+
+    python bench_blocks.py [--out PREFIX] [--limit SECONDS] [--seed S]
+                           [--algorithms a,b,...] [n ...]
+"""
+
+import csv
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+import blocks_world
+import harness
+import pddl
+import relaxation
+import search
+
+# name -> search(problem, relaxed heuristics); the problem is a
+# strips.BitsetProblem and its h_gbfs is the goal count.
+ALGORITHMS = [
+    ('bfs_tree', lambda p, h: search.breadth_first_tree_search(p)),
+    ('dfs_tree', lambda p, h: search.depth_first_tree_search(p)),
+    ('bfs', lambda p, h: search.breadth_first_graph_search(p)),
+    ('dfs', lambda p, h: search.depth_first_graph_search(p)),
+    ('dls', lambda p, h: search.depth_limited_search(p)),
+    ('ids', lambda p, h: search.iterative_deepening_search(p)),
+    ('ucs', lambda p, h: search.astar_search(p, lambda n: 0)),
+    ('astar_hmax', lambda p, h: search.astar_search(p, h.h_max)),
+    ('astar_lmcut', lambda p, h: search.astar_search(p, h.h_lmcut)),
+    ('gbfs', lambda p, h: search.greedy_best_first_graph_search(p, p.h_gbfs)),
+    ('gbfs_ff', lambda p, h: search.greedy_best_first_graph_search(p, h.h_ff)),
+    ('wastar_ff', lambda p, h: search.weighted_astar_search(p, h.h_ff, 2)),
+    ('beam_ff', lambda p, h: search.beam_search(p, h.h_ff)),
+    ('bfws', lambda p, h: search.best_first_width_search(p)),
+    ('rbfs', lambda p, h: search.recursive_best_first_search(p)),
+    ('hill_climbing', lambda p, h: search.hill_climbing(p)),
+    ('simulated_annealing', lambda p, h: search.simulated_annealing(p)),
+]
+
+# Left out of the default set: they fail on Python 2 leftovers in search.py
+# before searching, so they would only add error rows. --algorithms still
+# runs them.
+BROKEN = {
+    'dls': "recursive_dls compares a Node with None through Node.__ne__, which reads node.f",
+    'rbfs': "RBFS recurses without its flimit argument",
+    'hill_climbing': "hill_climbing calls an undefined expand",
+    'simulated_annealing': "simulated_annealing uses xrange and sys.maxint",
+}
+DEFAULT_ALGORITHMS = [name for name, _ in ALGORITHMS if name not in BROKEN]
+
+FIELDS = ('n', 'seed', 'algorithm', 'status', 'ground_s', 'search_s', 'expanded',
+          'length', 'facts', 'operators', 'peak_kib', 'error')
+
+
+def _run(path, algorithm, conn):
+    record = {}
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    try:
+        start = time.time()
+        problem = pddl.load(blocks_world.DOMAIN_PATH, path)
+        h = relaxation.RelaxedHeuristics(problem)
+        record.update(ground_s=time.time() - start, facts=len(problem.facts),
+                      operators=len(problem.operators))
+        conn.send(record)
+        start = time.time()
+        result = dict(ALGORITHMS)[algorithm](problem, h)
+        record['search_s'] = time.time() - start
+        if isinstance(result, tuple):
+            result, record['expanded'] = result
+        if isinstance(result, search.Node) and problem.goal_test(result.state):
+            record.update(status='ok', length=result.path_cost)
+        else:
+            record['status'] = 'no plan'
+    except Exception as e:
+        record.update(status='error', error='%s: %s' % (type(e).__name__, e))
+    record['peak_kib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+    conn.send(record)
+
+
+def run(path, algorithm, limit):
+    """Solve the problem file at path in a forked process; returns the
+    record fields measured before the limit ran out."""
+    record = {'status': 'timeout'}
+    with harness.Forked(_run, path, algorithm) as worker:
+        while 'search_s' not in record and 'error' not in record:
+            try:
+                message = worker.receive(limit)
+            except EOFError:
+                record.update(status='error', error='worker died')
+                break
+            if message is None:
+                break
+            record.update(message)
+    return record
+
+
+def benchmark(sizes, algorithms, limit, seed=0, out='bench_blocks'):
+    """Run every algorithm on every size and write the records; returns them."""
+    directory = tempfile.mkdtemp(prefix='blocks-')
+    run_info = {'time': time.time(), 'python': platform.python_version(),
+                'host': platform.node(), 'limit': limit}
+    records = []
+    with open(out + '.jsonl', 'a') as log:
+        for n, path in zip(sizes, blocks_world.write_problems(directory, sizes, seed)):
+            for algorithm in algorithms:
+                record = dict(n=n, seed=seed, algorithm=algorithm)
+                record.update(run(path, algorithm, limit))
+                records.append(record)
+                log.write(json.dumps(dict(run_info, **record)) + '\n')
+                log.flush()
+                print("n=%-4d %-20s %-8s ground %6s  search %7s  expanded %8s  length %4s  %s KiB" % (
+                    n, algorithm, record['status'], _fmt(record.get('ground_s')),
+                    _fmt(record.get('search_s')), record.get('expanded', '-'),
+                    record.get('length', '-'), record.get('peak_kib', '-')))
+                sys.stdout.flush()
+    with open(out + '.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(records)
+    for path in os.listdir(directory):
+        os.remove(os.path.join(directory, path))
+    os.rmdir(directory)
+    return records
+
+
+def _fmt(seconds):
+    return '-' if seconds is None else '%.2fs' % seconds
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Blocks-world scaling benchmark.")
+    parser.add_argument('sizes', nargs='*', type=int, default=[5, 10, 20, 50, 100],
+                        metavar='n', help="numbers of blocks (default: 5 10 20 50 100)")
+    parser.add_argument('--out', default='bench_blocks', metavar='PREFIX')
+    parser.add_argument('--limit', type=float, default=10.0, metavar='SECONDS')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--algorithms', default=','.join(DEFAULT_ALGORITHMS), metavar='a,b,...',
+                        help="default: all but %s" % ', '.join(sorted(BROKEN)))
+    args = parser.parse_args()
+    algorithms = args.algorithms.split(',')
+    unknown = set(algorithms) - set(name for name, _ in ALGORITHMS)
+    if unknown:
+        parser.error("unknown algorithms %s" % ', '.join(sorted(unknown)))
+    benchmark(args.sizes, algorithms, args.limit, args.seed, args.out)
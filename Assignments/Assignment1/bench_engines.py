@@ -0,0 +1,93 @@
+"""Hand-coded vs grounded engine benchmark on the watering domain.
+
+Every problem of ex1_check and of generator.scaling_suite is solved twice:
+by ex1.WateringProblem and by its PDDL export (watering_pddl) grounded into
+a strips.BitsetProblem. Both run the same search algorithm; for A* and
+GBFS each engine uses its own heuristics (h_astar / h_gbfs for the
+hand-coded one, h_max / h_FF from relaxation for the grounded one), while
+BFS compares the raw expansion rates. Each run is a forked process that is
+killed after the time limit. Prints plan length, expansions, nodes per
+second and time per engine, and the grounding time and task size.
+
+    python bench_engines.py [bfs|astar|gbfs ...] [--limit SECONDS]
+"""
+
+import sys
+import time
+
+import ex1
+import harness
+import relaxation
+import search
+import watering_pddl
+
+ALGORITHMS = ('bfs', 'astar', 'gbfs')
+
+
+def run_search(problem, algorithm, h_astar, h_gbfs):
+    if algorithm == 'bfs':
+        return search.breadth_first_graph_search(problem)
+    if algorithm == 'astar':
+        return search.astar_search(problem, h_astar)
+    return search.greedy_best_first_graph_search(problem, h_gbfs)
+
+
+def _measure(engine, game, algorithm, conn):
+    start = time.time()
+    if engine == 'hand':
+        problem = ex1.WateringProblem(game)
+        h_astar, h_gbfs = problem.h_astar, problem.h_gbfs
+        size = None
+    else:
+        problem = watering_pddl.ground(game)
+        h = relaxation.RelaxedHeuristics(problem)
+        h_astar, h_gbfs = h.h_max, h.h_ff
+        size = (len(problem.facts), len(problem.operators))
+    setup = time.time() - start
+    start = time.time()
+    result = run_search(problem, algorithm, h_astar, h_gbfs)
+    elapsed = time.time() - start
+    if result is None:
+        conn.send((None, None, elapsed, setup, size))
+    else:
+        conn.send((result[0].path_cost, result[1], elapsed, setup, size))
+
+
+def measure(engine, game, algorithm, limit):
+    """(plan length, expanded, search seconds, setup seconds, (facts,
+    operators) or None), or None if the run exceeded limit seconds."""
+    with harness.Forked(_measure, engine, game, algorithm) as run:
+        return run.receive(limit)
+
+
+def _format(result):
+    if result is None:
+        return "%-38s" % "timeout"
+    length, expanded, elapsed, _, _ = result
+    if length is None:
+        return "%-38s" % ("no plan  %6.2fs" % elapsed)
+    return "%4d %8d %9.0f/s %7.2fs    " % (length, expanded, expanded / max(elapsed, 1e-9), elapsed)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Hand-coded vs grounded engine benchmark.")
+    parser.add_argument('algorithms', nargs='*', metavar='ALGORITHM',
+                        help="any of %s (default: all)" % ', '.join(ALGORITHMS))
+    parser.add_argument('--limit', type=float, default=60.0, metavar='SECONDS')
+    args = parser.parse_args()
+    if set(args.algorithms) - set(ALGORITHMS):
+        parser.error("algorithms must be among %s" % ', '.join(ALGORITHMS))
+    limit = args.limit
+    algorithms = args.algorithms or list(ALGORITHMS)
+    print("%-18s %-5s  %-38s %-38s %s" % ("problem", "alg", "hand-coded: len expanded rate time",
+                                          "grounded: len expanded rate time", "grounding"))
+    for name, game in harness.problems(unsolvable=True):
+        for algorithm in algorithms:
+            hand = measure('hand', game, algorithm, limit)
+            grounded = measure('grounded', game, algorithm, limit)
+            task = ""
+            if grounded is not None:
+                task = "%.2fs, %d facts, %d ops" % ((grounded[3],) + grounded[4])
+            print("%-18s %-5s  %s %s %s" % (name, algorithm, _format(hand), _format(grounded), task))
+            sys.stdout.flush()
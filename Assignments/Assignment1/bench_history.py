@@ -0,0 +1,203 @@
+"""Benchmark history and performance-regression detection.
+
+'record' solves every ex1_check problem with A* and GBFS a number of
+times and appends one row per run to a local SQLite database: the git
+commit, problem, algorithm, repeat number, expansions, seconds, plan
+length and peak traced memory. The peak is measured in one extra run
+under tracemalloc so that tracing does not slow down the timed runs.
+
+'compare' takes the runs of a baseline and a candidate commit and, per
+(problem, algorithm), compares the median times. A slowdown is flagged
+only when it exceeds both the relative threshold and the spread of the
+measurements (factor times the larger interquartile range) and is at least
+floor seconds, so sub-millisecond runs do not raise noise. Any change in
+expansions or plan length is flagged as well, since both are
+deterministic. The exit status is 1 if something regressed.
+
+    python bench_history.py record [--db PATH] [--repeats N] [--commit LABEL]
+    python bench_history.py compare [BASELINE [CANDIDATE]] [--db PATH]
+    python bench_history.py history [--db PATH]
+"""
+
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import ex1
+import harness
+import search
+
+ALGORITHMS = {
+    'astar': lambda p: search.astar_search(p, p.h_astar),
+    'gbfs': lambda p: search.greedy_best_first_graph_search(p, p.h_gbfs),
+}
+
+
+def current_commit():
+    """The short hash of HEAD, with '+' appended if the tree has changes,
+    or 'unknown' outside a git checkout."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('+' if dirty else '')
+
+
+def connect(path):
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE IF NOT EXISTS runs (run REAL NOT NULL, commit_id TEXT NOT NULL,"
+               " problem TEXT NOT NULL, algorithm TEXT NOT NULL, repeat INTEGER NOT NULL,"
+               " expanded INTEGER, seconds REAL NOT NULL, length INTEGER, peak_kib REAL)")
+    db.execute("CREATE INDEX IF NOT EXISTS runs_commit ON runs (commit_id, problem, algorithm)")
+    return db
+
+
+def measure(game, algorithm):
+    "(expanded, seconds, plan length) of one run; None fields if unsolved."
+    problem = ex1.WateringProblem(game)
+    start = time.perf_counter()
+    result = ALGORITHMS[algorithm](problem)
+    seconds = time.perf_counter() - start
+    if result is None:
+        return None, seconds, None
+    node, expanded = result
+    return expanded, seconds, node.path_cost
+
+
+def peak_memory(game, algorithm):
+    "Peak traced memory of one run, in KiB."
+    tracemalloc.start()
+    try:
+        ALGORITHMS[algorithm](ex1.WateringProblem(game))
+        return tracemalloc.get_traced_memory()[1] / 1024.0
+    finally:
+        tracemalloc.stop()
+
+
+def record(path, repeats=5, commit=None):
+    "Run the benchmark repeats times and append the runs; returns the commit."
+    commit = commit or current_commit()
+    run = time.time()
+    db = connect(path)
+    with db:
+        for name, game in harness.problems(unsolvable=True, generated=False):
+            for algorithm in sorted(ALGORITHMS):
+                peak = peak_memory(game, algorithm)
+                for repeat in range(repeats):
+                    expanded, seconds, length = measure(game, algorithm)
+                    db.execute("INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                               (run, commit, name, algorithm, repeat, expanded, seconds,
+                                length, peak))
+    db.close()
+    return commit
+
+
+def summary(values):
+    "(median, interquartile range) of values."
+    if len(values) < 2:
+        return values[0], 0.0
+    q1, _, q3 = statistics.quantiles(values, n=4, method='inclusive')
+    return statistics.median(values), q3 - q1
+
+
+def compare(path, baseline=None, candidate=None, threshold=0.10, factor=1.5,
+            floor=0.002):
+    """Compare the runs of candidate (default: the latest commit recorded)
+    with baseline (default: the one recorded before it). Returns a list of
+    (problem, algorithm, message) regressions and prints a table."""
+    db = connect(path)
+    commits = [c for c, in db.execute("SELECT commit_id FROM runs GROUP BY commit_id"
+                                      " ORDER BY MAX(run)")]
+    if candidate is None:
+        candidate = commits[-1] if commits else None
+    if baseline is None:
+        older = [c for c in commits if c != candidate]
+        baseline = older[-1] if older else None
+    if baseline is None or candidate is None:
+        raise ValueError("need runs of two commits to compare, have %s" % (commits,))
+
+    def runs(commit):
+        result = {}
+        for problem, algorithm, expanded, seconds, length, peak in db.execute(
+                "SELECT problem, algorithm, expanded, seconds, length, peak_kib FROM runs"
+                " WHERE commit_id = ?", (commit,)):
+            entry = result.setdefault((problem, algorithm), ([], set(), set(), []))
+            entry[0].append(seconds)
+            entry[1].add(expanded)
+            entry[2].add(length)
+            entry[3].append(peak)
+        return result
+
+    base, cand = runs(baseline), runs(candidate)
+    db.close()
+    regressions = []
+    print("%s -> %s" % (baseline, candidate))
+    print("%-18s %-6s %12s %12s %8s  %s" % ("problem", "alg", "base median", "cand median",
+                                            "change", "verdict"))
+    for key in sorted(set(base) & set(cand)):
+        (b_times, b_exp, b_len, b_peak), (c_times, c_exp, c_len, c_peak) = base[key], cand[key]
+        b_median, b_iqr = summary(b_times)
+        c_median, c_iqr = summary(c_times)
+        change = (c_median - b_median) / b_median if b_median else 0.0
+        problems_found = []
+        slower = c_median - b_median
+        if change > threshold and slower > max(factor * max(b_iqr, c_iqr), floor):
+            problems_found.append("%.0f%% slower" % (100 * change))
+        if b_exp != c_exp:
+            problems_found.append("expansions %s -> %s" % (sorted(b_exp, key=str),
+                                                           sorted(c_exp, key=str)))
+        if b_len != c_len:
+            problems_found.append("length %s -> %s" % (sorted(b_len, key=str),
+                                                       sorted(c_len, key=str)))
+        if max(c_peak) > (1 + threshold) * max(b_peak) + 64:
+            problems_found.append("peak memory %.0f -> %.0f KiB" % (max(b_peak), max(c_peak)))
+        verdict = "; ".join(problems_found) or "ok"
+        print("%-18s %-6s %11.4fs %11.4fs %+7.1f%%  %s" % (
+            key[0], key[1], b_median, c_median, 100 * change, verdict))
+        regressions.extend((key[0], key[1], message) for message in problems_found)
+    return regressions
+
+
+def history(path):
+    "Print one line per recorded commit: runs and total median time."
+    db = connect(path)
+    for commit, count, first in db.execute(
+            "SELECT commit_id, COUNT(*), MIN(run) FROM runs GROUP BY commit_id ORDER BY MIN(run)"):
+        medians = []
+        for problem, algorithm in db.execute(
+                "SELECT DISTINCT problem, algorithm FROM runs WHERE commit_id = ?", (commit,)):
+            times = [s for s, in db.execute(
+                "SELECT seconds FROM runs WHERE commit_id = ? AND problem = ? AND algorithm = ?",
+                (commit, problem, algorithm))]
+            medians.append(statistics.median(times))
+        print("%-12s %s  %4d runs  total median %.4fs" % (
+            commit, time.strftime('%Y-%m-%d %H:%M', time.localtime(first)), count, sum(medians)))
+    db.close()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Record and compare benchmark runs.")
+    parser.add_argument('command', nargs='?', default='record',
+                        choices=('record', 'compare', 'history'))
+    parser.add_argument('commits', nargs='*', metavar='COMMIT',
+                        help="compare: BASELINE [CANDIDATE]")
+    parser.add_argument('--db', default='bench_history.sqlite', metavar='PATH')
+    parser.add_argument('--repeats', type=int, default=5, metavar='N')
+    parser.add_argument('--commit', metavar='LABEL', help="record under LABEL, not git HEAD")
+    args = parser.parse_args()
+    if args.commits and args.command != 'compare' or len(args.commits) > 2:
+        parser.error("only compare takes commits, at most two")
+    if args.command == 'record':
+        print("recorded", record(args.db, args.repeats, args.commit))
+    elif args.command == 'compare':
+        found = compare(args.db, *args.commits)
+        sys.exit(1 if found else 0)
+    else:
+        history(args.db)
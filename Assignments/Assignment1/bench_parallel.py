@@ -0,0 +1,39 @@
+"""HDA* scaling benchmark: wall time and expansions against worker count.
+
+Solves every map of generator.scaling_suite with serial A* and then with
+parallel_search.hda_star_search for each worker count, both with h_astar,
+and prints cost, expansions, time and the speedup over serial A*.
+
+    python bench_parallel.py [workers ...]
+"""
+
+import time
+
+import ex1
+import generator
+import parallel_search
+import search
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="HDA* wall time against worker count.")
+    parser.add_argument('counts', nargs='*', type=int, default=[1, 2, 4, 8, 16],
+                        metavar='WORKERS')
+    args = parser.parse_args()
+    for name, game in generator.scaling_suite():
+        p = ex1.create_watering_problem(game)
+        start = time.time()
+        result = search.astar_search(p, p.h_astar)
+        serial = time.time() - start
+        if result is None:
+            print("%-8s unsolvable" % name)
+            continue
+        print("%-8s astar     cost %3d  expanded %8d  %7.2fs" %
+              (name, result[0].path_cost, result[1], serial))
+        for n in args.counts:
+            start = time.time()
+            node, expanded = parallel_search.hda_star_search(p, p.h_astar, workers=n)
+            elapsed = time.time() - start
+            print("%-8s hda*(%2d)  cost %3d  expanded %8d  %7.2fs  speedup %.2f" %
+                  (name, n, node.path_cost, expanded, elapsed, serial / elapsed))
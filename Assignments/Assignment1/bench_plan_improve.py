@@ -0,0 +1,48 @@
+"""Plan improvement benchmark: GBFS plans before and after improve_plan.
+
+Solves the solvable ex1_check problems, the generated suite and larger
+three-robot maps with GBFS, shortens each plan with
+plan_improve.improve_plan and prints both lengths, the optimal length where
+A* is affordable (maps of at most 64 cells) and the time of each step.
+
+    python bench_plan_improve.py [--window N] [--limit N]
+"""
+
+import sys
+import time
+
+import ex1
+import generator
+import harness
+import plan_improve
+import search
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="GBFS plans before and after improve_plan.")
+    parser.add_argument('--window', type=int, default=12, metavar='N',
+                        help="longest stretch a splice replaces")
+    parser.add_argument('--limit', type=int, default=2000, metavar='N',
+                        help="expansions per bounded A*")
+    args = parser.parse_args()
+    games = harness.problems() + generator.scaling_suite(sizes=(9, 10), robots=3, taps=2,
+                                                          plants=3)
+    print("%-10s %9s %9s %9s %9s %9s" % ("problem", "gbfs", "improved", "optimal",
+                                        "gbfs s", "improve s"))
+    for name, game in games:
+        problem = ex1.WateringProblem(game)
+        start = time.time()
+        node, _ = search.greedy_best_first_graph_search(problem, problem.h_gbfs)
+        plan = [n.action for n in node.path()[::-1]][1:]
+        found = time.time() - start
+        start = time.time()
+        better = plan_improve.improve_plan(game, plan, args.window, args.limit)
+        spent = time.time() - start
+        # A* for the optimal length is only affordable on the small maps.
+        optimal = "-"
+        if game["Size"][0] * game["Size"][1] <= 64:
+            optimal = search.astar_search(problem, problem.h_astar)[0].path_cost
+        print("%-10s %9d %9d %9s %8.3fs %8.3fs" % (name, len(plan), len(better), optimal,
+                                                  found, spent))
+        sys.stdout.flush()
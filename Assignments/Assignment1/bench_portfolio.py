@@ -0,0 +1,32 @@
+"""Portfolio benchmark: the winning member per instance.
+
+Races portfolio.default_members on every ex1_check problem and the
+generated suite and prints the winner, its plan length and the report of
+every member, then the number of wins per member, for tuning the default
+portfolio.
+
+    python bench_portfolio.py [first|best] [--deadline SECONDS]
+"""
+
+import harness
+import portfolio
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="The winning portfolio member per instance.")
+    parser.add_argument('mode', nargs='?', default='first', choices=('first', 'best'))
+    parser.add_argument('--deadline', type=float, default=60.0, metavar='SECONDS')
+    args = parser.parse_args()
+    wins = {}
+    for name, game in harness.problems(unsolvable=True):
+        outcome = portfolio.run_portfolio(game, mode=args.mode, deadline=args.deadline)
+        winner = outcome["winner"]
+        wins[winner] = wins.get(winner, 0) + 1
+        length = len(outcome["plan"]) if outcome["plan"] is not None else '-'
+        print("%-18s winner %-10s length %s" % (name, winner, length))
+        for member, info in sorted(outcome["members"].items()):
+            print("    %-10s %-12s length %-5s expanded %-8s time %s" %
+                  (member, info["status"], info["length"], info["expanded"],
+                   info["time"] if info["time"] is None else "%.3f" % info["time"]))
+    print("wins:", wins)
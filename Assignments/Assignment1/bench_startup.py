@@ -0,0 +1,51 @@
+"""Cold-start benchmark: import cost and wall time of solving one small problem.
+
+Every run starts a fresh interpreter with -X importtime, solves problem1 with
+A* through ex1_check and exits, which is what each short-lived solver process
+pays. Prints the median wall time, the total import time and the modules with
+the largest cumulative import time, and checks that pygame was not loaded.
+
+    python bench_startup.py [runs]
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+SNIPPET = ("import ex1_check; "
+           "ex1_check.solve_problems(ex1_check.problem1, 'astar', 8)")
+
+
+def run_once():
+    """Return (wall seconds, {module: (self us, cumulative us, depth)})."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", SNIPPET],
+                          cwd=here, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(own), int(cumulative), depth)
+    return elapsed, modules
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    run_once()  # Write the .pyc files before timing.
+    results = [run_once() for _ in range(runs)]
+    walls = sorted(wall for wall, _ in results)
+    _, modules = results[-1]
+    total = sum(cum for _, cum, depth in modules.values() if depth == 0)
+    print("runs: %d  median wall: %.1f ms  min wall: %.1f ms" %
+          (runs, 1000 * walls[len(walls) // 2], 1000 * walls[0]))
+    print("total import time (last run): %.1f ms" % (total / 1000.0))
+    print("pygame imported:", "pygame" in modules,
+          " simulator imported:", "simulator" in modules)
+    print("largest cumulative imports:")
+    for name, (own, cum, _) in sorted(modules.items(), key=lambda m: -m[1][1])[:12]:
+        print("  %-24s self %6.2f ms  cumulative %6.2f ms" % (name, own / 1000.0, cum / 1000.0))
@@ -0,0 +1,48 @@
+"""Closed-table memory benchmark: A* against state_table.table_search.
+
+Solves the solvable ex1_check problems and the generated suite with
+search.astar_search and with table_search over a StateTable, both with
+h_astar, and prints plan length, expansions, time and peak memory. With a
+directory the table is memory-mapped there and its files are counted in
+the peak, since tracemalloc does not see them.
+
+    python bench_state_table.py [DIRECTORY]
+
+Needs numpy."""
+
+import sys
+import time
+import tracemalloc
+
+import ex1
+import harness
+import search
+import state_table
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="A* against table_search.")
+    parser.add_argument('directory', nargs='?', help="memory-map the table there")
+    args = parser.parse_args()
+    print("%-10s %-14s %5s %9s %9s %11s" % ("problem", "engine", "len", "expanded", "time",
+                                           "peak KiB"))
+    for name, game in harness.problems():
+        for label in ('astar', 'table_search'):
+            problem = ex1.WateringProblem(game)
+            tracemalloc.start()
+            start = time.time()
+            if label == 'astar':
+                node, expanded = search.astar_search(problem, problem.h_astar)
+                extra = 0
+            else:
+                table = state_table.StateTable(directory=args.directory)
+                node, expanded = state_table.table_search(problem, problem.h_astar, table)
+                # NumPy buffers are traced too, except memory-mapped files.
+                extra = table.nbytes() if args.directory is not None else 0
+            elapsed = time.time() - start
+            peak = tracemalloc.get_traced_memory()[1] + extra
+            tracemalloc.stop()
+            print("%-10s %-14s %5d %9d %8.3fs %11.0f" % (name, label, node.path_cost, expanded,
+                                                        elapsed, peak / 1024.0))
+            sys.stdout.flush()
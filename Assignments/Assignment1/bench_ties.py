@@ -0,0 +1,46 @@
+"""Tie-breaking benchmark for A* on the watering domain.
+
+Solves the ex1_check problems and the generated suite with A* and h_astar,
+once with the default PriorityQueue and once per BucketQueue policy, and
+prints plan length, expansions and time. Every policy must find the same
+optimal length; only the number of nodes expanded on the last f-plateau
+differs.
+
+    python bench_ties.py [seeds]
+"""
+
+import sys
+import time
+
+import ex1
+import harness
+import search
+
+POLICIES = [None, 'fifo', 'lifo', 'high_g', 'low_h']
+
+
+if __name__ == '__main__':
+    seeds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    runs = [(policy, None) for policy in POLICIES]
+    runs += [('random', seed) for seed in range(seeds)]
+    totals = dict(((policy, seed), 0) for policy, seed in runs)
+    print("%-10s %-10s %5s %9s %9s" % ("problem", "tie", "len", "expanded", "time"))
+    for name, game in harness.problems():
+        optimal = None
+        for policy, seed in runs:
+            problem = ex1.WateringProblem(game)
+            start = time.time()
+            node, expanded = search.astar_search(problem, problem.h_astar, tie=policy, seed=seed)
+            elapsed = time.time() - start
+            optimal = node.path_cost if optimal is None else optimal
+            assert node.path_cost == optimal, (name, policy, node.path_cost, optimal)
+            totals[policy, seed] += expanded
+            label = policy or 'default'
+            if seed is not None:
+                label += '/%d' % seed
+            print("%-10s %-10s %5d %9d %8.3fs" % (name, label, node.path_cost, expanded, elapsed))
+            sys.stdout.flush()
+    print("total expansions:")
+    for (policy, seed), total in sorted(totals.items(), key=lambda t: t[1]):
+        print("  %-10s %9d" % ((policy or 'default') + ('' if seed is None else '/%d' % seed),
+                               total))
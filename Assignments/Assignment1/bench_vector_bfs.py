@@ -0,0 +1,33 @@
+"""Frontier-batched BFS benchmark: breadth_first_graph_search against vector_bfs.
+
+Solves the solvable ex1_check problems and the generated suite with both,
+checks every plan with ex1.check_plan and prints plan length, expansions,
+time and nodes per second.
+
+    python bench_vector_bfs.py
+
+Needs numpy."""
+
+import sys
+import time
+
+import ex1
+import harness
+import search
+import vector_bfs
+
+
+if __name__ == '__main__':
+    print("%-10s %-10s %5s %9s %9s %12s" % ("problem", "engine", "len", "expanded", "time",
+                                           "nodes/s"))
+    for name, game in harness.problems():
+        for label, engine in (('bfs', search.breadth_first_graph_search),
+                              ('vector', vector_bfs.vector_bfs)):
+            problem = ex1.WateringProblem(game)
+            start = time.time()
+            node, expanded = engine(problem)
+            elapsed = time.time() - start
+            assert ex1.check_plan(game, [n.action for n in node.path()[::-1]][1:])
+            print("%-10s %-10s %5d %9d %8.3fs %12.0f" % (name, label, node.path_cost, expanded,
+                                                        elapsed, expanded / max(elapsed, 1e-9)))
+            sys.stdout.flush()
@@ -0,0 +1,88 @@
+"""Random blocks-world problems for Recs/domain.pddl.
+
+States are drawn uniformly from all blocks-world states over n labelled
+blocks, as in Slaney and Thiebaux's bwstates: a state with k towers is one
+of the L(n, k) = C(n-1, k-1) n! / k! ways to split the blocks into k
+unordered stacks, so k is chosen with weight L(n, k) and the state is a
+random permutation cut into k stacks at random points. Initial and goal
+states are drawn independently; the goal lists the on and ontable facts.
+
+    python blocks_world.py DIRECTORY [--seed S] [n ...]
+"""
+
+import math
+import os
+import random
+
+DOMAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           os.pardir, os.pardir, 'Recs', 'domain.pddl')
+
+SIZES = (5, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100)
+
+
+def random_towers(blocks, rng):
+    """A uniformly random state over blocks as a list of towers, each listed
+    from the bottom block up."""
+    n = len(blocks)
+    weights = [math.comb(n - 1, k - 1) * math.factorial(n) // math.factorial(k)
+               for k in range(1, n + 1)]
+    pick = rng.randrange(sum(weights))
+    k = 1
+    while pick >= weights[k - 1]:
+        pick -= weights[k - 1]
+        k += 1
+    order = list(blocks)
+    rng.shuffle(order)
+    cuts = [0] + sorted(rng.sample(range(1, n), k - 1)) + [n]
+    return [order[a:b] for a, b in zip(cuts, cuts[1:])]
+
+
+def tower_facts(towers):
+    "The ontable, on and clear facts of a state, as PDDL atoms."
+    facts = []
+    for tower in towers:
+        facts.append("(ontable %s)" % tower[0])
+        facts.extend("(on %s %s)" % (above, below) for below, above in zip(tower, tower[1:]))
+        facts.append("(clear %s)" % tower[-1])
+    return facts
+
+
+def problem_pddl(n, seed=0):
+    "The text of a random n-block problem; equal (n, seed) give equal text."
+    rng = random.Random("%d:%d" % (n, seed))
+    blocks = ["b%d" % i for i in range(1, n + 1)]
+    init = tower_facts(random_towers(blocks, rng)) + ["(handempty)"]
+    goal = [fact for fact in tower_facts(random_towers(blocks, rng))
+            if not fact.startswith("(clear")]
+    return "\n".join([
+        "(define (problem bw-%d-%d)" % (n, seed),
+        "  (:domain blocks)",
+        "  (:objects %s - block)" % " ".join(blocks),
+        "  (:init %s)" % " ".join(init),
+        "  (:goal (and %s)))" % " ".join(goal),
+        ""])
+
+
+def write_problems(directory, sizes=SIZES, seed=0):
+    "Write bw-N-SEED.pddl for every n in sizes and return the file paths."
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    paths = []
+    for n in sizes:
+        path = os.path.join(directory, "bw-%d-%d.pddl" % (n, seed))
+        with open(path, "w") as f:
+            f.write(problem_pddl(n, seed))
+        paths.append(path)
+    return paths
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Write random blocks-world problems.")
+    parser.add_argument('directory')
+    parser.add_argument('sizes', nargs='*', type=int, default=SIZES, metavar='n',
+                        help="numbers of blocks (default: %s)" % ' '.join(map(str, SIZES)))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    for path in write_problems(args.directory, args.sizes, args.seed):
+        print(path)
@@ -1,48 +1,618 @@
-import ex1_check
+import array
+import itertools
+import sys
+
 import search
-import utils
+from utils import infinity, memoize, weak_memoize
 
 id = ["No numbers - I'm special!"]
 
+MOVES = (("UP", -1, 0), ("DOWN", 1, 0), ("LEFT", 0, -1), ("RIGHT", 0, 1))
+
+# Finite stand-in for an impossible assignment in the h_astar cost matrix.
+FAR = 1 << 30
+
+# Entries of the per-problem h_astar cache, keyed by state.
+H_CACHE_SIZE = 1 << 16
+
+
+def grid_distances(size, walls, source):
+    """Breadth-first distances from source to every reachable cell of the grid.
+    Robots are ignored; only walls and the grid borders block movement.
+    Returns a dict {(r, c): distance}."""
+    rows, cols = size
+    dist = {source: 0}
+    layer = [source]
+    d = 0
+    while layer:
+        d += 1
+        next_layer = []
+        for (r, c) in layer:
+            for _, dr, dc in MOVES:
+                cell = (r + dr, c + dc)
+                if (0 <= cell[0] < rows and 0 <= cell[1] < cols
+                        and cell not in walls and cell not in dist):
+                    dist[cell] = d
+                    next_layer.append(cell)
+        layer = next_layer
+    return dist
+
+
+def grid_bitboard(size, walls):
+    """The free cells of the grid as one int: cell (r, c) is bit
+    r * (cols + 1) + c. The extra column per row stays 0, so that shifting
+    by one never wraps a cell into the next row. Returns (mask, stride)."""
+    rows, cols = size
+    stride = cols + 1
+    digits = ['0'] * (rows * stride)
+    for r in range(rows):
+        digits[r * stride:r * stride + cols] = '1' * cols
+    for r, c in walls:
+        if 0 <= r < rows and 0 <= c < cols:
+            digits[r * stride + c] = '0'
+    return int(''.join(reversed(digits)), 2), stride
+
+
+def distance_layers(free, stride, source):
+    """Breadth-first layers from source over the free mask of grid_bitboard:
+    element d is the mask of the cells at distance d. Each layer grows from
+    the previous one with four shifts, so a step costs a few big-int
+    operations instead of one Python iteration per cell."""
+    frontier = seen = 1 << (source[0] * stride + source[1])
+    layers = []
+    while frontier:
+        layers.append(frontier)
+        frontier = ((frontier << 1) | (frontier >> 1) | (frontier << stride)
+                    | (frontier >> stride)) & free & ~seen
+        seen |= frontier
+    return layers
+
 
+def bitboard_distances(size, walls, sources):
+    """grid_distances for many sources at once: {source: {(r, c): distance}}.
+    The free mask is built once. Instead of reading every layer cell by
+    cell, the layers of a source are folded into bit planes of the distance
+    (plane k holds the cells whose distance has bit k set). Each plane is
+    spread to one 16-bit slot per cell by encoding its binary digits as
+    UTF-16, and the shifted planes add up to an array of distances, from
+    which the reached cells are picked with itertools.compress. A source
+    with distances beyond 0xFFFF, which do not fit a slot, falls back to
+    grid_distances.
 
+    Every layer costs operations on the whole board, so this only beats
+    grid_distances when there are few layers for the cells they reach, as
+    on open maps; see distance_tables."""
+    free, stride = grid_bitboard(size, walls)
+    width = size[0] * stride
+    cells = [divmod(i, stride) for i in range(width)]
+    zero = int.from_bytes(('0' * width).encode('utf-16-le'), 'little')
+    result = {}
+    for source in sources:
+        layers = distance_layers(free, stride, source)
+        if len(layers) > 0x10000:
+            result[source] = grid_distances(size, walls, source)
+            continue
+        planes, reached = [], 0
+        for d, layer in enumerate(layers):
+            reached |= layer
+            k = 0
+            while d >> k:
+                if k == len(planes):
+                    planes.append(0)
+                if d >> k & 1:
+                    planes[k] |= layer
+                k += 1
+        total = 0
+        for k, plane in enumerate(planes):
+            digits = format(plane, '0%db' % width)[::-1].encode('utf-16-le')
+            total += (int.from_bytes(digits, 'little') - zero) << k
+        values = array.array('H', total.to_bytes(2 * width, 'little'))
+        if sys.byteorder == 'big':
+            values.byteswap()
+        flags = format(reached, '0%db' % width)[::-1].encode().replace(b'0', b'\0')
+        result[source] = dict(zip(itertools.compress(cells, flags),
+                                  itertools.compress(values, flags)))
+    return result
+
+
+def distance_tables(size, walls, sources):
+    """{source: grid_distances(size, walls, source)} for each source. The
+    first table is always a breadth-first search. If it shows an open map,
+    at least half of the cells reached and no distance beyond rows + cols,
+    the other tables come from bitboard_distances; on mazes and sparse
+    maps, where the layers are many or mostly empty, they stay BFS."""
+    sources = tuple(sources)
+    if not sources:
+        return {}
+    rows, cols = size
+    first = grid_distances(size, walls, sources[0])
+    if 2 * len(first) >= rows * cols and max(first.values()) <= rows + cols:
+        result = bitboard_distances(size, walls, sources[1:])
+    else:
+        result = dict((source, grid_distances(size, walls, source)) for source in sources[1:])
+    result[sources[0]] = first
+    return result
+
+
+def expand_macro_plan(actions):
+    """Flatten a plan that may contain macro actions (tuples of primitive
+    action strings) into the primitive strings the simulator expects."""
+    plan = []
+    for action in actions:
+        if isinstance(action, tuple):
+            plan.extend(action)
+        else:
+            plan.append(action)
+    return plan
+
+
+def assign(cost, rows, u, v, match):
+    """Hungarian method on the square matrix cost (lists of rows, 0-based):
+    add each row of rows (1-based) to the matching by one shortest
+    augmenting path. u and v are the row and column potentials and
+    match[j] the row matched to column j, all 1-based with a sentinel at
+    index 0; they are updated in place. Any state with feasible potentials
+    (u[i] + v[j] <= cost) and tight matched pairs may be resumed, which is
+    what lets a changed column be re-solved from the previous solution."""
+    m = len(v) - 1
+    for i in rows:
+        match[0] = i
+        j0 = 0
+        minv = [float('inf')] * (m + 1)
+        used = [False] * (m + 1)
+        way = [0] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            row = cost[i0 - 1]
+            ui0 = u[i0]
+            delta = float('inf')
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - ui0 - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+
+
+def check_plan(game, plan):
+    """Replay plan on game without the simulator or a search problem. True
+    if every action is legal and all plants are watered at the end."""
+    rows, cols = game["Size"]
+    walls = game["Walls"]
+    taps = dict(game["Taps"])
+    plants = dict(game["Plants"])
+    robots = dict((rid, list(data)) for rid, data in game["Robots"].items())
+    occupied = set((r, c) for r, c, _, _ in robots.values())
+    deltas = dict((name, (dr, dc)) for name, dr, dc in MOVES)
+    for action in expand_macro_plan(plan):
+        name, _, rid = action.partition("{")
+        robot = robots.get(int(rid.rstrip("}"))) if rid[:-1].isdigit() else None
+        if robot is None:
+            return False
+        r, c, load, capacity = robot
+        if name in deltas:
+            cell = (r + deltas[name][0], c + deltas[name][1])
+            if (not (0 <= cell[0] < rows and 0 <= cell[1] < cols)
+                    or cell in walls or cell in occupied):
+                return False
+            occupied.remove((r, c))
+            occupied.add(cell)
+            robot[0], robot[1] = cell
+        elif name == "LOAD":
+            if taps.get((r, c), 0) <= 0 or load >= capacity:
+                return False
+            taps[(r, c)] -= 1
+            robot[2] += 1
+        elif name == "POUR":
+            if plants.get((r, c), 0) <= 0 or load <= 0:
+                return False
+            plants[(r, c)] -= 1
+            robot[2] -= 1
+        else:
+            return False
+    return not any(plants.values())
 
 
 class WateringProblem(search.Problem):
-    """This class implements a pressure plate problem"""
+    """This class implements a pressure plate problem
+
+    A state is a tuple (robots, taps, plants): robots holds one (r, c, load)
+    triple per robot id in self.robot_ids order, taps and plants hold the
+    remaining water per cell in self.tap_cells / self.plant_cells order.
+
+    With macro=True a single successor walks a robot along a precomputed
+    shortest path to a tap or plant and then does k LOADs or POURs there.
+    Such an action is a tuple of primitive action strings and costs its
+    length, so plan costs are the same as in the primitive encoding."""
+
+    def __init__(self, initial, macro=False):
 
-    def __init__(self, initial):
 
-        
         """ Constructor only needs the initial state.
         Don't forget to set the goal or implement the goal test"""
-        search.Problem.__init__(self, initial)
+        self.size = initial["Size"]
+        self.walls = frozenset(initial["Walls"])
+        self.macro = macro
+        self.robot_ids = tuple(sorted(initial["Robots"]))
+        self.capacity = tuple(initial["Robots"][rid][3] for rid in self.robot_ids)
+        self.tap_cells = tuple(sorted(initial["Taps"]))
+        self.plant_cells = tuple(sorted(initial["Plants"]))
+        self.tap_index = dict((cell, i) for i, cell in enumerate(self.tap_cells))
+        self.plant_index = dict((cell, i) for i, cell in enumerate(self.plant_cells))
+        self.distances = distance_tables(self.size, self.walls,
+                                         self.tap_cells + self.plant_cells)
+        self._paths = {}
+        self._targets = {}
+        # Several nodes reach the same state; they share one h_astar entry.
+        self.h_astar = memoize(self.h_astar, maxsize=H_CACHE_SIZE, key=lambda node: node.state)
+        # The assignment solution of a node lives no longer than the node.
+        self._solution = weak_memoize(self._solve)
+        robots = tuple(initial["Robots"][rid][:3] for rid in self.robot_ids)
+        taps = tuple(initial["Taps"][cell] for cell in self.tap_cells)
+        plants = tuple(initial["Plants"][cell] for cell in self.plant_cells)
+        search.Problem.__init__(self, (robots, taps, plants))
+        # Mixed radix of pack(): cell and load per robot, then the water
+        # of every tap and plant, which never exceeds its initial amount.
+        rows, cols = self.size
+        self.radix = []
+        for cap in self.capacity:
+            self.radix += [rows * cols, cap + 1]
+        self.radix += [water + 1 for water in taps + plants]
+        span = 1
+        for base in self.radix:
+            span *= base
+        self.key_bits = (span - 1).bit_length()
+
+    def pack(self, state):
+        """The state as one int below 2 ** self.key_bits, for tables that
+        store int keys instead of state tuples."""
+        robots, taps, plants = state
+        cols = self.size[1]
+        digits = []
+        for r, c, load in robots:
+            digits += [r * cols + c, load]
+        key = 0
+        for digit, base in zip(digits + list(taps + plants), self.radix):
+            key = key * base + digit
+        return key
+
+    def unpack(self, key):
+        "The inverse of pack."
+        digits = []
+        for base in reversed(self.radix):
+            key, digit = divmod(key, base)
+            digits.append(digit)
+        digits.reverse()
+        cols = self.size[1]
+        n = 2 * len(self.capacity)
+        robots = tuple(divmod(digits[i], cols) + (digits[i + 1],) for i in range(0, n, 2))
+        taps = tuple(digits[n:n + len(self.tap_cells)])
+        plants = tuple(digits[n + len(self.tap_cells):])
+        return robots, taps, plants
 
     def successor(self, state):
         """ Generates the successor states returns [(action, achieved_states, ...)]"""
-        utils.raiseNotDefined()
+        if self.macro:
+            return self.macro_successor(state)
+        robots, taps, plants = state
+        if sum(taps) + sum(load for _, _, load in robots) < sum(plants):
+            return []
+        occupied = set((r, c) for r, c, _ in robots)
+        result = []
+        for i, (r, c, load) in enumerate(robots):
+            rid = self.robot_ids[i]
+            for name, cell in self._moves(r, c, occupied):
+                result.append(("%s{%d}" % (name, rid),
+                               (self._replace(robots, i, cell + (load,)), taps, plants)))
+            t = self.tap_index.get((r, c))
+            if t is not None and taps[t] > 0 and load < self.capacity[i]:
+                result.append(("LOAD{%d}" % rid,
+                               (self._replace(robots, i, (r, c, load + 1)),
+                                self._replace(taps, t, taps[t] - 1), plants)))
+            p = self.plant_index.get((r, c))
+            if p is not None and plants[p] > 0 and load > 0:
+                result.append(("POUR{%d}" % rid,
+                               (self._replace(robots, i, (r, c, load - 1)), taps,
+                                self._replace(plants, p, plants[p] - 1))))
+        return result
+
+    def macro_successor(self, state):
+        """Macro successors: go to a tap and LOAD k times, or go to a plant
+        and POUR k times. Paths come from the distance tables and ignore the
+        other robots; collisions are only checked when a path is walked. If
+        any path is blocked, primitive moves are offered as well so that the
+        robots can make way for each other."""
+        robots, taps, plants = state
+        if sum(taps) + sum(load for _, _, load in robots) < sum(plants):
+            return []
+        occupied = set((r, c) for r, c, _ in robots)
+        result = []
+        blocked = False
+        for i, (r, c, load) in enumerate(robots):
+            rid = self.robot_ids[i]
+            others = occupied - {(r, c)}
+            if load < self.capacity[i]:
+                for t, cell in enumerate(self.tap_cells):
+                    if taps[t] == 0:
+                        continue
+                    moves = self._walk((r, c), cell, rid, others)
+                    if moves is None:
+                        blocked = blocked or (r, c) in self.distances[cell]
+                        continue
+                    for k in range(1, min(taps[t], self.capacity[i] - load) + 1):
+                        result.append((moves + ("LOAD{%d}" % rid,) * k,
+                                       (self._replace(robots, i, cell + (load + k,)),
+                                        self._replace(taps, t, taps[t] - k), plants)))
+            if load > 0:
+                for p, cell in enumerate(self.plant_cells):
+                    if plants[p] == 0:
+                        continue
+                    moves = self._walk((r, c), cell, rid, others)
+                    if moves is None:
+                        blocked = blocked or (r, c) in self.distances[cell]
+                        continue
+                    for k in range(1, min(plants[p], load) + 1):
+                        result.append((moves + ("POUR{%d}" % rid,) * k,
+                                       (self._replace(robots, i, cell + (load - k,)), taps,
+                                        self._replace(plants, p, plants[p] - k))))
+        if blocked:
+            for i, (r, c, load) in enumerate(robots):
+                for name, cell in self._moves(r, c, occupied):
+                    result.append((("%s{%d}" % (name, self.robot_ids[i]),),
+                                   (self._replace(robots, i, cell + (load,)), taps, plants)))
+        return result
+
+    def path_cost(self, c, state1, action, state2):
+        if isinstance(action, tuple):
+            return c + len(action)
+        return c + 1
 
     def goal_test(self, state):
         """ given a state, checks if this is the goal state, compares to the created goal state returns True/False"""
-        utils.raiseNotDefined()
+        return not any(state[2])
+
+    def atoms(self, state):
+        """Atoms for width-based search: robot-at-cell and robot-load per
+        robot, and the water left in every tap and plant."""
+        robots, taps, plants = state
+        atoms = []
+        for i, (r, c, load) in enumerate(robots):
+            atoms.append(('at', i, r, c))
+            atoms.append(('load', i, load))
+        for t, water in enumerate(taps):
+            atoms.append(('tap', t, water))
+        for p, need in enumerate(plants):
+            atoms.append(('plant', p, need))
+        return atoms
 
     def h_astar(self, node):
         """ This is the heuristic. It gets a node (not a state)
-        and returns a goal distance estimate"""
-        utils.raiseNotDefined()
+        and returns a goal distance estimate
+
+        Every missing unit is poured once and loaded once if not carried.
+        For the walking, take the first POUR at each unwatered plant and,
+        if water must be loaded, the first LOAD of the plan. Each is done
+        by a robot that walked there from its previous LOAD or POUR (a tap
+        with water or another unwatered plant) or from its start, and a
+        start can only precede that robot's first action. The walks are
+        disjoint parts of the plan, so a min-cost assignment of these
+        actions to previous stops is a lower bound on the moves; robots are
+        ignored, as in the BFS distances, so the bound is admissible."""
+        robots, taps, plants = node.state
+        need = sum(plants)
+        if need == 0:
+            return 0
+        carried = sum(load for _, _, load in robots)
+        if need > carried + sum(taps):
+            return infinity
+        moves = self._solution(node)[3]
+        if moves >= FAR:
+            return infinity
+        return need + max(0, need - carried) + moves
+
+    def _solve(self, node):
+        """The walking assignment of h_astar as (u, v, match, cost). Rows are
+        the actions, then one idle row per robot; columns are the robots,
+        then one column per action for its cheapest stop other than a robot
+        start. Solutions are held by self._solution, a weak_memoize of this
+        method, and when a child only moved one robot its column is
+        re-solved from the parent's with a single augmenting path instead of
+        from scratch."""
+        robots, taps, plants = node.state
+        cost = self._matrix(robots, taps, plants)
+        parent = node.parent
+        solution = None
+        if parent is not None:
+            # The searches evaluate all children of a node before expanding
+            # any of them, so by now every child of the grandparent is done.
+            if parent.parent is not None:
+                self._solution.forget(parent.parent)
+            before, parent_taps, parent_plants = parent.state
+            if (parent_taps == taps and parent_plants == plants
+                    and all(a[2] == b[2] for a, b in zip(before, robots))):
+                moved = [i for i, (a, b) in enumerate(zip(before, robots)) if a != b]
+                if len(moved) == 1:
+                    solution = self._solution.peek(parent)
+        if solution is not None:
+            u, v, match = [list(part) for part in solution[:3]]
+            j = moved[0] + 1
+            free = match[j]
+            match[j] = 0
+            v[j] = min(row[j - 1] - u[i + 1] for i, row in enumerate(cost))
+            assign(cost, [free], u, v, match)
+        else:
+            size = len(cost) + 1
+            u, v, match = [0] * size, [0] * size, [0] * size
+            assign(cost, range(1, size), u, v, match)
+        total = sum(cost[match[j] - 1][j - 1] for j in range(1, len(match)))
+        return tuple(u), tuple(v), tuple(match), total
+
+    def _matrix(self, robots, taps, plants):
+        """The cost matrix of _solve for a state. The targets and their
+        stop costs depend only on the water left and the loads, and are
+        cached per such key; only the robot columns are new per state."""
+        key = (taps, plants, tuple(load for _, _, load in robots))
+        targets, stops = self._targets.get(key) or self._stops(key, robots, taps, plants)
+        n, k = len(targets), len(robots)
+        cost = []
+        for i in range(n):
+            row = [FAR] * (k + n)
+            row[k + i] = stops[i]
+            cost.append(row)
+        for j, robot in enumerate(robots):
+            for i, c in enumerate(self._column(robot, j, targets)):
+                cost[i][j] = c
+        return cost + [[0] * (k + n) for _ in range(k)]
+
+    def _stops(self, key, robots, taps, plants):
+        "The (targets, stop costs) of _matrix for key, cached."
+        needy = [cell for cell, left in zip(self.plant_cells, plants) if left]
+        full_taps = [cell for cell, left in zip(self.tap_cells, taps) if left]
+        # Targets: (plant cell, True) for a first POUR and (tap cells with
+        # water, False) for the first LOAD.
+        targets = [(cell, True) for cell in needy]
+        if sum(plants) > sum(load for _, _, load in robots):
+            targets.append((tuple(full_taps), False))
+        stops = []
+        for cell, pour in targets:
+            if pour:
+                costs = [self.distances[cell].get(t, FAR) for t in full_taps]
+                costs += [self.distances[cell].get(q, FAR) for q in needy if q != cell]
+            elif any(load for _, _, load in robots):
+                # Some POUR comes first, so the LOAD can follow a plant.
+                costs = [self.distances[t].get(q, FAR) for t in full_taps for q in needy]
+            else:
+                costs = []
+            stops.append(min(costs or [FAR]))
+        self._targets[key] = targets, stops
+        return targets, stops
+
+    def _column(self, robot, j, targets):
+        """Costs of the action targets when they are robot j's first action:
+        a POUR needs water on board and a LOAD needs room for it."""
+        r, c, load = robot
+        column = []
+        for cell, pour in targets:
+            if pour:
+                column.append(self.distances[cell].get((r, c), FAR) if load else FAR)
+            elif load < self.capacity[j]:
+                column.append(min([self.distances[t].get((r, c), FAR) for t in cell] or [FAR]))
+            else:
+                column.append(FAR)
+        return column
+
+    def h_reach(self, node):
+        """The simpler admissible estimate that h_astar replaced: the LOADs
+        and POURs left plus the Manhattan distance from the closest robot
+        to an unwatered plant."""
+        robots, taps, plants = node.state
+        need = sum(plants)
+        if need == 0:
+            return 0
+        carried = sum(load for _, _, load in robots)
+        reach = min(abs(r - pr) + abs(c - pc)
+                    for (r, c, _) in robots
+                    for (pr, pc), left in zip(self.plant_cells, plants) if left)
+        return need + max(0, need - carried) + reach
 
     def h_gbfs(self, node):
         """ This is the heuristic. It gets a node (not a state)
         and returns a goal distance estimate"""
-        utils.raiseNotDefined()
+        robots, taps, plants = node.state
+        need = sum(plants)
+        if need == 0:
+            return 0
+        carried = sum(load for _, _, load in robots)
+        # LOADs and POURs left, weighted so that one of them always outweighs
+        # the walk it causes; otherwise loading would raise the estimate.
+        total = (self.size[0] + self.size[1]) * (need + max(0, need - carried))
+        needy = [cell for cell, left in zip(self.plant_cells, plants) if left]
+        full_taps = [cell for cell, left in zip(self.tap_cells, taps) if left]
+        fetch = []
+        for (r, c, load) in robots:
+            if load:
+                total += min(self.distances[cell].get((r, c), 0) for cell in needy)
+            elif need > carried and full_taps:
+                fetch.append(min(self.distances[tap].get((r, c), 0) +
+                                 min(self.distances[cell].get(tap, 0) for cell in needy)
+                                 for tap in full_taps))
+        # Only the empty robot closest to a tap-then-plant trip is pulled in;
+        # pulling all of them makes them crowd around the same tap.
+        return total + min(fetch or [0])
+
+    def _moves(self, r, c, occupied):
+        """Yield (name, cell) for every legal single-cell move from (r, c)."""
+        rows, cols = self.size
+        for name, dr, dc in MOVES:
+            cell = (r + dr, c + dc)
+            if (0 <= cell[0] < rows and 0 <= cell[1] < cols
+                    and cell not in self.walls and cell not in occupied):
+                yield name, cell
+
+    def _path(self, start, target):
+        """Shortest path from start to target as a tuple of move names, or
+        None if target is unreachable. Paths are cached per (start, target)."""
+        key = (start, target)
+        if key not in self._paths:
+            dist = self.distances[target]
+            if start not in dist:
+                self._paths[key] = None
+            else:
+                names, cells, cell = [], [], start
+                while cell != target:
+                    for name, dr, dc in MOVES:
+                        step = (cell[0] + dr, cell[1] + dc)
+                        if dist.get(step) == dist[cell] - 1:
+                            break
+                    names.append(name)
+                    cells.append(step)
+                    cell = step
+                self._paths[key] = (tuple(names), tuple(cells))
+        return self._paths[key]
+
+    def _walk(self, start, target, rid, others):
+        """Primitive moves taking robot rid from start to target, or None if
+        the target is unreachable or the path runs into another robot."""
+        path = self._path(start, target)
+        if path is None:
+            return None
+        names, cells = path
+        for cell in cells:
+            if cell in others:
+                return None
+        return tuple("%s{%d}" % (name, rid) for name in names)
+
+    @staticmethod
+    def _replace(items, i, value):
+        return items[:i] + (value,) + items[i + 1:]
 
 
-def create_watering_problem(game):
+def create_watering_problem(game, macro=False):
     print("<<create_watering_problem")
     """ Create a pressure plate problem, based on the description.
-    game - tuple of tuples as described in pdf file"""
-    return WateringProblem(game)
+    game - tuple of tuples as described in pdf file
+    macro - use go-to-tap-and-load / go-to-plant-and-pour macro actions"""
+    return WateringProblem(game, macro)
 
 
 if __name__ == '__main__':
+    import ex1_check
     ex1_check.main()
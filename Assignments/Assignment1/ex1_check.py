@@ -1,7 +1,6 @@
 import time
 import ex1
 import search
-import simulator
 
 
 def run_problem(func, targs=(), kwargs=None):
@@ -36,15 +35,18 @@ def run_and_visualize(problem, algorithm='gbfs'):
     
     if result and isinstance(result[0], search.Node):
         solve = result[0].path()[::-1]
-        solution = [pi.action for pi in solve][1:]
+        solution = ex1.expand_macro_plan([pi.action for pi in solve][1:])
         print(f"[{algorithm.upper()}] Solution found with {len(solution)} steps")
         print(f"Actions: {solution}")
+        import simulator
         simulator.main(problem, solution)
     else:
         print(f"[{algorithm.upper()}] No solution found")
 
 
-def solve_problems(problem, algorithm, optimal_len=None):
+def search_plan(problem, algorithm):
+    """Build the problem and run algorithm on it. Returns the primitive plan,
+    or None if there is no solution or the problem cannot be created."""
     try:
         p = ex1.create_watering_problem(problem)
     except Exception as e:
@@ -58,7 +60,17 @@ def solve_problems(problem, algorithm, optimal_len=None):
 
     if result and isinstance(result[0], search.Node):
         solve = result[0].path()[::-1]
-        solution = [pi.action for pi in solve][1:]  # type: ignore
+        return ex1.expand_macro_plan([pi.action for pi in solve][1:])  # type: ignore
+    return None
+
+
+def solve_problems(problem, algorithm, optimal_len=None, cache=None):
+    if cache is not None:
+        solution = cache.solve(problem, algorithm, lambda game: search_plan(game, algorithm))
+    else:
+        solution = search_plan(problem, algorithm)
+
+    if solution is not None:
         steps = len(solution)
         
         if algorithm == "gbfs":
@@ -68,6 +80,7 @@ def solve_problems(problem, algorithm, optimal_len=None):
             if optimal_len is not None and optimal_len != -1:
                 if steps > optimal_len:
                     print(f"[A*] solved with {steps} steps, optimal solution is {optimal_len} steps - SUBOPTIMAL!")
+                    import simulator
                     simulator.main(problem, solution)
                 else:
                     print(f"[A*] solved with {steps} steps, optimal solution is {optimal_len} steps")
@@ -183,23 +196,57 @@ problem7 = {
 }
 
 
-def main():
-    start = time.time()
-    problems = [
-        (problem1, 8),
-        (problem2, 20),
-        (problem3, 28),
-        (problem4, 13),
-        (problem5_deadend, -1),
-        (problem6, 8),
-        (problem7, 21),
+def all_problems():
+    """(name, game, optimal length) of the problems above; -1 means no
+    solution. batch_solve.py --export writes them as JSONL."""
+    return [
+        ('problem1', problem1, 8),
+        ('problem2', problem2, 20),
+        ('problem3', problem3, 28),
+        ('problem4', problem4, 13),
+        ('problem5_deadend', problem5_deadend, -1),
+        ('problem6', problem6, 8),
+        ('problem7', problem7, 21),
     ]
-    for p, opt in problems:
+
+
+def main(cache_path=None, profile=None, profile_dir='profiles'):
+    """Solve every problem with both algorithms. If cache_path is given,
+    plans are looked up in and stored to a SolutionCache at that path.
+    With profile ('cprofile' or 'sample') every (problem, algorithm) run is
+    profiled separately into profile_dir/<problem>-<algorithm>.pstats and
+    .collapsed, and the hot spots over all runs are printed at the end."""
+    cache = None
+    if cache_path is not None:
+        import solution_cache
+        cache = solution_cache.SolutionCache(cache_path)
+    if profile is not None:
+        import os
+        import profiling
+    start = time.time()
+    profiles = []
+    for name, p, opt in all_problems():
         for a in ['astar', 'gbfs']:
-            solve_problems(p, a, opt)
+            if profile is None:
+                solve_problems(p, a, opt, cache)
+                continue
+            prefix = os.path.join(profile_dir, '%s-%s' % (name, a))
+            profiling.profile_call(lambda: solve_problems(p, a, opt, cache), profile, prefix)
+            profiles.append(prefix + '.pstats')
     end = time.time()
     print('Submission took:', end - start, 'seconds.')
+    if profiles:
+        profiling.summarize(profiles)
+
 
 if __name__ == '__main__':
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Solve the ex1 problems with A* and GBFS.")
+    parser.add_argument('--cache', metavar='PATH', help="SolutionCache file for the plans")
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=('cprofile', 'sample'),
+                        help="profile every run (default: cprofile)")
+    parser.add_argument('--profile-dir', default='profiles', metavar='DIR',
+                        help="where the profiles go (default: profiles)")
+    args = parser.parse_args()
+    main(args.cache, args.profile, args.profile_dir)
     # run_and_visualize(problem4)
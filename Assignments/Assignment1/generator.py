@@ -0,0 +1,49 @@
+"""Random watering instances in the ex1_check game-dict format.
+
+The generated maps are used by the benchmarks of the search extensions.
+Every instance is seeded, so a (seed, parameters) pair always produces the
+same map, and every tap and plant is reachable from every robot."""
+
+import random
+
+import ex1
+
+
+def random_watering_problem(rows, cols, robots=2, taps=1, plants=2,
+                            wall_density=0.15, capacity=(1, 3), seed=None):
+    """Return a game dict with the given number of objects on a rows x cols
+    grid. Taps hold enough water for all plants, so the instance is solvable
+    unless the robots block each other in."""
+    rng = random.Random(seed)
+    cells = [(r, c) for r in range(rows) for c in range(cols)]
+    while True:
+        walls = set(cell for cell in cells if rng.random() < wall_density)
+        free = [cell for cell in cells if cell not in walls]
+        if len(free) < robots + taps + plants:
+            continue
+        chosen = rng.sample(free, robots + taps + plants)
+        reachable = ex1.grid_distances((rows, cols), walls, chosen[0])
+        if all(cell in reachable for cell in chosen):
+            break
+    robot_cells = chosen[:robots]
+    tap_cells = chosen[robots:robots + taps]
+    plant_cells = chosen[robots + taps:]
+    needs = dict((cell, rng.randint(1, 3)) for cell in plant_cells)
+    water = sum(needs.values())
+    tap_water = dict((cell, water // taps + (i < water % taps) + rng.randint(0, 1))
+                     for i, cell in enumerate(tap_cells))
+    return {
+        "Size": (rows, cols),
+        "Walls": walls,
+        "Taps": tap_water,
+        "Plants": needs,
+        "Robots": dict((10 + i, (r, c, 0, rng.randint(*capacity)))
+                       for i, (r, c) in enumerate(robot_cells)),
+    }
+
+
+def scaling_suite(seed=0, sizes=(4, 5, 6, 7, 8), robots=2, taps=1, plants=2):
+    """A list of (name, game) pairs of growing square maps."""
+    return [("gen%dx%d" % (n, n),
+             random_watering_problem(n, n, robots, taps, plants, seed=seed + n))
+            for n in sizes]
@@ -0,0 +1,64 @@
+"""Shared pieces of the benchmark scripts and the portfolio.
+
+problems is the benchmark instance list: the ex1_check problems followed by
+the generated scaling suite. Forked runs a function in a forked process
+that reports back through a one-way pipe, so the caller can stop waiting
+after a time limit and kill the process; wait watches several of them."""
+
+import multiprocessing
+import multiprocessing.connection
+import time
+
+import ex1_check
+import generator
+
+
+def problems(unsolvable=False, generated=True):
+    """[(name, game)] of the ex1_check problems, without the unsolvable ones
+    unless unsolvable, followed by generator.scaling_suite() if generated."""
+    named = [(name, game) for name, game, optimal in ex1_check.all_problems()
+             if unsolvable or optimal >= 0]
+    return named + (generator.scaling_suite() if generated else [])
+
+
+class Forked:
+    """target(*args, conn) running in a forked process, where conn is the
+    sending end of a pipe. Use it as a context manager or call stop, so the
+    process is terminated however the caller leaves."""
+
+    def __init__(self, target, *args):
+        ctx = multiprocessing.get_context('fork')
+        self.conn, child = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(target=target, args=args + (child,))
+        self.start = time.time()
+        self.process.start()
+        # Only the child may hold the sending end, or a dead child would
+        # never show up as EOFError.
+        child.close()
+
+    def receive(self, limit=None):
+        """The next message, or None if none arrives before limit seconds
+        after the start (None waits for ever). Raises EOFError once the
+        process has exited and every message was read."""
+        left = None if limit is None else max(limit - (time.time() - self.start), 0)
+        if not self.conn.poll(left):
+            return None
+        return self.conn.recv()
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def wait(runs, timeout=None):
+    """The Forked runs among runs with a message or an EOF to read, after at
+    most timeout seconds."""
+    ready = multiprocessing.connection.wait([run.conn for run in runs], timeout)
+    return [run for run in runs if run.conn in ready]
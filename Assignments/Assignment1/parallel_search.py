@@ -0,0 +1,172 @@
+"""Hash-distributed A* (HDA*) over a pool of local worker processes.
+
+Every state is owned by the worker hash(state) % workers. A worker keeps its
+own open heap and closed table and only ever expands states it owns; children
+are sent to their owners in batches over multiprocessing queues. A worker
+that pops a goal publishes its cost as the incumbent and keeps searching
+until no open node anywhere has f below the incumbent, so with an admissible
+heuristic the returned solution is optimal.
+
+Workers are forked, so the problem and its heuristic are inherited rather
+than pickled; only states and actions travel between processes and must be
+picklable."""
+
+import heapq
+import multiprocessing
+import queue
+import time
+
+from search import Node
+from utils import infinity
+
+
+def hda_star_search(problem, h=None, workers=4, batch=64):
+    """A* search distributed over worker processes. Returns (node, expanded)
+    like graph_search, or None if there is no solution."""
+    h = h or problem.h
+    ctx = multiprocessing.get_context('fork')
+    inboxes = [ctx.Queue() for _ in range(workers)]
+    results = ctx.Queue()
+    # Layout: sent[0..workers] (last slot is the coordinator), then recv,
+    # idle and expanded for each worker. All updates hold counters' lock.
+    counters = ctx.Array('q', 4 * workers + 1)
+    incumbent = ctx.Value('d', infinity)
+    procs = [ctx.Process(target=_worker,
+                         args=(i, problem, h, inboxes, results, counters,
+                               incumbent, batch))
+             for i in range(workers)]
+    for p in procs:
+        p.start()
+    try:
+        with counters.get_lock():
+            counters[workers] += 1
+        inboxes[hash(problem.initial) % workers].put(
+            ('nodes', [(problem.initial, 0, None, None)]))
+        while not _terminated(counters, workers):
+            if not all(p.is_alive() for p in procs):
+                raise RuntimeError("HDA* worker died")
+            time.sleep(0.001)
+        for inbox in inboxes:
+            inbox.put(('best',))
+        best = min((results.get() for _ in range(workers)),
+                   key=lambda r: r[0])
+        expanded = sum(counters[3 * workers + 1:])
+        if best[1] is None:
+            return None
+        steps, state = [], best[1]
+        while True:
+            inboxes[hash(state) % workers].put(('trace', state))
+            parent, action = results.get()
+            if parent is None:
+                break
+            steps.append((action, state))
+            state = parent
+        node = Node(problem.initial)
+        for action, state in reversed(steps):
+            node = Node(state, node, action,
+                        problem.path_cost(node.path_cost, node.state, action, state))
+        return node, expanded
+    finally:
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        for p in procs:
+            p.join()
+
+
+def _terminated(counters, workers):
+    """All workers idle and every sent batch received. The snapshot is taken
+    under the lock that guards every counter update, so a balanced snapshot
+    means no batch is still in flight."""
+    with counters.get_lock():
+        sent = sum(counters[:workers + 1])
+        recv = sum(counters[workers + 1:2 * workers + 1])
+        idle = all(counters[2 * workers + 1:3 * workers + 1])
+    return idle and sent == recv
+
+
+def _worker(i, problem, h, inboxes, results, counters, incumbent, batch):
+    workers = len(inboxes)
+    recv_slot, idle_slot, exp_slot = (workers + 1 + i, 2 * workers + 1 + i,
+                                      3 * workers + 1 + i)
+    inbox = inboxes[i]
+    open_list, closed = [], {}
+    outbox = [[] for _ in range(workers)]
+    best = (infinity, None)
+    tick = expanded = 0
+
+    def flush(j):
+        with counters.get_lock():
+            counters[i] += 1
+        inboxes[j].put(('nodes', outbox[j]))
+        outbox[j] = []
+
+    def receive(state, g, parent, action):
+        nonlocal tick
+        old = closed.get(state)
+        if old is not None and old[0] <= g:
+            return
+        f = g + h(Node(state, None, action, g))
+        if f >= incumbent.value:
+            return
+        closed[state] = (g, parent, action)
+        tick += 1
+        heapq.heappush(open_list, (f, tick, g, state))
+
+    def handle(msg):
+        if msg[0] == 'nodes':
+            with counters.get_lock():
+                counters[idle_slot] = 0
+                counters[recv_slot] += 1
+            for item in msg[1]:
+                receive(*item)
+        elif msg[0] == 'trace':
+            _, parent, action = closed[msg[1]]
+            results.put((parent, action))
+        elif msg[0] == 'best':
+            results.put(best)
+        elif msg[0] == 'stop':
+            return False
+        return True
+
+    while True:
+        try:
+            while True:
+                if not handle(inbox.get_nowait()):
+                    return
+        except queue.Empty:
+            pass
+        if open_list and open_list[0][0] < incumbent.value:
+            f, _, g, state = heapq.heappop(open_list)
+            if closed[state][0] != g:
+                continue
+            if problem.goal_test(state):
+                if g < best[0]:
+                    best = (g, state)
+                with incumbent.get_lock():
+                    if g < incumbent.value:
+                        incumbent.value = g
+                continue
+            expanded += 1
+            for action, child in problem.successor(state):
+                g2 = problem.path_cost(g, state, action, child)
+                j = hash(child) % workers
+                if j == i:
+                    receive(child, g2, state, action)
+                else:
+                    outbox[j].append((child, g2, state, action))
+                    if len(outbox[j]) >= batch:
+                        flush(j)
+            if expanded % batch == 0:
+                for j in range(workers):
+                    if outbox[j]:
+                        flush(j)
+        else:
+            del open_list[:]
+            for j in range(workers):
+                if outbox[j]:
+                    flush(j)
+            with counters.get_lock():
+                counters[exp_slot] = expanded
+                counters[idle_slot] = 1
+            if not handle(inbox.get()):
+                return
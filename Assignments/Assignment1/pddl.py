@@ -0,0 +1,353 @@
+"""PDDL domain and problem parsing and grounding for STRIPS tasks.
+
+Supports the :strips and :typing requirements, which covers the blocks world
+in Recs/domain.pddl. The grounder only instantiates actions whose
+preconditions are reachable from the initial state in the delete relaxation,
+and the result is a search.Problem whose states are frozensets of ground
+facts, so astar_search and the other searches can solve it directly.
+
+    problem = pddl.load('Recs/domain.pddl', 'problem.pddl')
+    node, expanded = search.astar_search(problem, problem.h_gbfs)
+"""
+
+import re
+
+import search
+
+SUPPORTED_REQUIREMENTS = (':strips', ':typing')
+
+
+class Action:
+    """A lifted action schema. Preconditions and effects are tuples of atoms;
+    an atom is a tuple (predicate, term, ...), with variables starting '?'."""
+
+    def __init__(self, name, parameters, pre, add, delete):
+        self.name = name
+        self.parameters = parameters
+        self.pre = pre
+        self.add = add
+        self.delete = delete
+
+    def __repr__(self):
+        return "<Action %s>" % self.name
+
+
+class Domain:
+    def __init__(self, name, types, constants, predicates, actions):
+        self.name = name
+        self.types = types
+        self.constants = constants
+        self.predicates = predicates
+        self.actions = actions
+
+    def __repr__(self):
+        return "<Domain %s>" % self.name
+
+
+class Task:
+    """A PDDL problem instance: typed objects, initial facts and goal facts."""
+
+    def __init__(self, name, domain_name, objects, init, goal):
+        self.name = name
+        self.domain_name = domain_name
+        self.objects = objects
+        self.init = init
+        self.goal = goal
+
+    def __repr__(self):
+        return "<Task %s>" % self.name
+
+
+class Operator:
+    """A ground action: name is the PDDL plan step, e.g. '(stack a b)', and
+    pre/add/delete are frozensets of ground facts."""
+
+    def __init__(self, name, pre, add, delete):
+        self.name = name
+        self.pre = pre
+        self.add = add
+        self.delete = delete
+
+    def __repr__(self):
+        return "<Operator %s>" % self.name
+
+
+class StripsProblem(search.Problem):
+    """A grounded STRIPS task as a search problem. States are frozensets of
+    ground facts and actions are the operator names."""
+
+    def __init__(self, operators, init, goal, facts=None):
+        search.Problem.__init__(self, frozenset(init), frozenset(goal))
+        self.operators = operators
+        self.facts = facts
+
+    def successor(self, state):
+        return [(op.name, (state - op.delete) | op.add)
+                for op in self.operators if op.pre <= state]
+
+    def goal_test(self, state):
+        return self.goal <= state
+
+    def h_gbfs(self, node):
+        "Goal count: the number of goal facts that do not hold yet."
+        return len(self.goal - node.state)
+
+
+# ______________________________________________________________________________
+# Parsing
+
+def tokenize(text):
+    "Split PDDL text into parentheses and lower-cased symbols, dropping comments."
+    return re.findall(r'[()]|[^\s()]+', re.sub(r';[^\n]*', '', text).lower())
+
+
+def parse_sexpr(text):
+    "Parse PDDL text into nested tuples of symbols."
+    stack = [[]]
+    for token in tokenize(text):
+        if token == '(':
+            stack.append([])
+        elif token == ')':
+            if len(stack) == 1:
+                raise ValueError("unbalanced ')' in PDDL input")
+            expr = tuple(stack.pop())
+            stack[-1].append(expr)
+        else:
+            stack[-1].append(token)
+    if len(stack) != 1 or len(stack[0]) != 1:
+        raise ValueError("PDDL input must be exactly one balanced expression")
+    return stack[0][0]
+
+
+def parse_typed_list(items):
+    """Parse 'a b - t1 c - t2 d' into [(a, t1), (b, t1), (c, t2), (d, object)]."""
+    result, names = [], []
+    items = list(items)
+    i = 0
+    while i < len(items):
+        if items[i] == '-':
+            if i + 1 >= len(items) or not isinstance(items[i + 1], str):
+                raise ValueError("'-' must be followed by a type name")
+            result.extend((name, items[i + 1]) for name in names)
+            names = []
+            i += 2
+        else:
+            names.append(items[i])
+            i += 1
+    result.extend((name, 'object') for name in names)
+    return result
+
+
+def _conjunction(expr, allow_negation):
+    """Split a precondition or effect into (positive atoms, negated atoms)."""
+    if expr == ():
+        return (), ()
+    parts = expr[1:] if expr[0] == 'and' else (expr,)
+    positive, negative = [], []
+    for part in parts:
+        if part[0] == 'not':
+            if not allow_negation:
+                raise ValueError("negative preconditions are not supported: %s" % (part,))
+            negative.append(tuple(part[1]))
+        elif part[0] in ('or', 'imply', 'exists', 'forall', 'when', '='):
+            raise ValueError("'%s' is not supported by :strips" % part[0])
+        else:
+            positive.append(tuple(part))
+    return tuple(positive), tuple(negative)
+
+
+def _check_requirements(section):
+    for req in section[1:]:
+        if req not in SUPPORTED_REQUIREMENTS:
+            raise ValueError("unsupported requirement %s" % req)
+
+
+def parse_domain(text):
+    "Parse the text of a PDDL domain file into a Domain."
+    expr = parse_sexpr(text)
+    if expr[0] != 'define' or expr[1][0] != 'domain':
+        raise ValueError("not a PDDL domain")
+    types, constants, predicates, actions = {'object': None}, {}, {}, []
+    for section in expr[2:]:
+        key = section[0]
+        if key == ':requirements':
+            _check_requirements(section)
+        elif key == ':types':
+            for name, parent in parse_typed_list(section[1:]):
+                if name != 'object':
+                    types[name] = parent
+                types.setdefault(parent, 'object')
+        elif key == ':constants':
+            constants.update(parse_typed_list(section[1:]))
+        elif key == ':predicates':
+            for pred in section[1:]:
+                predicates[pred[0]] = parse_typed_list(pred[1:])
+        elif key == ':action':
+            fields = dict(zip(section[2::2], section[3::2]))
+            pre, _ = _conjunction(fields.get(':precondition', ()), False)
+            add, delete = _conjunction(fields.get(':effect', ()), True)
+            actions.append(Action(section[1], parse_typed_list(fields.get(':parameters', ())),
+                                  pre, add, delete))
+        else:
+            raise ValueError("unsupported domain section %s" % key)
+    return Domain(expr[1][1], types, constants, predicates, actions)
+
+
+def parse_problem(text):
+    "Parse the text of a PDDL problem file into a Task."
+    expr = parse_sexpr(text)
+    if expr[0] != 'define' or expr[1][0] != 'problem':
+        raise ValueError("not a PDDL problem")
+    name, domain_name, objects, init, goal = expr[1][1], None, {}, set(), ()
+    for section in expr[2:]:
+        key = section[0]
+        if key == ':domain':
+            domain_name = section[1]
+        elif key == ':requirements':
+            _check_requirements(section)
+        elif key == ':objects':
+            objects.update(parse_typed_list(section[1:]))
+        elif key == ':init':
+            init.update(tuple(atom) for atom in section[1:])
+        elif key == ':goal':
+            goal, negative = _conjunction(section[1], True)
+            if negative:
+                raise ValueError("negative goals are not supported")
+        else:
+            raise ValueError("unsupported problem section %s" % key)
+    return Task(name, domain_name, objects, frozenset(init), frozenset(goal))
+
+
+# ______________________________________________________________________________
+# Grounding
+
+def _objects_by_type(domain, task):
+    "Map every type to the objects of that type or one of its subtypes."
+    objects = dict(domain.constants)
+    objects.update(task.objects)
+    result = dict((t, []) for t in domain.types)
+    for obj, t in sorted(objects.items()):
+        if t not in domain.types:
+            raise ValueError("object %s has unknown type %s" % (obj, t))
+        while t is not None:
+            result[t].append(obj)
+            t = domain.types[t]
+    return result
+
+
+def _add_fact(index, fact):
+    """Index fact under (predicate,) and under (predicate, position, value)
+    for each argument, so that a partially bound atom is matched against the
+    facts sharing one of its bound arguments only."""
+    index.setdefault(fact[:1], set()).add(fact)
+    for pos in range(1, len(fact)):
+        index.setdefault((fact[0], pos, fact[pos]), set()).add(fact)
+
+
+def _bindings(action, index, objects):
+    """Yield every parameter binding of action whose preconditions are all in
+    index (built by _add_fact)."""
+    types = dict(action.parameters)
+    allowed = dict((v, set(objects[t])) for v, t in action.parameters)
+    # Match the most constraining preconditions first.
+    pre = sorted(action.pre, key=lambda atom: len(index.get(atom[:1], ())))
+
+    def candidates(atom, binding):
+        for pos in range(1, len(atom)):
+            term = atom[pos]
+            value = binding.get(term) if term.startswith('?') else term
+            if value is not None:
+                return index.get((atom[0], pos, value), ())
+        return index.get(atom[:1], ())
+
+    def extend(i, binding):
+        if i == len(pre):
+            free = [v for v, _ in action.parameters if v not in binding]
+            yield from complete(free, dict(binding))
+            return
+        atom = pre[i]
+        for fact in candidates(atom, binding):
+            if len(fact) != len(atom):
+                continue
+            new = binding
+            for term, value in zip(atom[1:], fact[1:]):
+                if term.startswith('?'):
+                    bound = new.get(term)
+                    if bound is None:
+                        if value not in allowed[term]:
+                            break
+                        if new is binding:
+                            new = dict(binding)
+                        new[term] = value
+                    elif bound != value:
+                        break
+                elif term != value:
+                    break
+            else:
+                yield from extend(i + 1, new)
+
+    def complete(free, binding):
+        if not free:
+            yield dict(binding)
+            return
+        for obj in objects[types[free[0]]]:
+            binding[free[0]] = obj
+            yield from complete(free[1:], binding)
+        binding.pop(free[0], None)
+
+    return extend(0, {})
+
+
+def ground(domain, task):
+    """Ground task with reachability analysis. Returns a StripsProblem whose
+    operators are exactly the ground actions applicable in some state of
+    the delete relaxation."""
+    if task.domain_name is not None and task.domain_name != domain.name:
+        raise ValueError("problem is for domain %s, not %s" % (task.domain_name, domain.name))
+    objects = _objects_by_type(domain, task)
+    for action in domain.actions:
+        for _, t in action.parameters:
+            if t not in objects:
+                raise ValueError("action %s has unknown type %s" % (action.name, t))
+    reachable = set(task.init)
+    index = {}
+    for fact in reachable:
+        _add_fact(index, fact)
+    operators = {}
+    changed = True
+    while changed:
+        changed = False
+        for action in domain.actions:
+            # Materialize first: new facts are added to index below.
+            for binding in list(_bindings(action, index, objects)):
+                args = tuple(binding[v] for v, _ in action.parameters)
+                if (action.name, args) in operators:
+                    continue
+                sub = lambda atom: (atom[0],) + tuple(binding.get(t, t) for t in atom[1:])
+                op = Operator('(%s)' % ' '.join((action.name,) + args),
+                              frozenset(map(sub, action.pre)),
+                              frozenset(map(sub, action.add)),
+                              frozenset(map(sub, action.delete)))
+                operators[(action.name, args)] = op
+                for fact in op.add:
+                    if fact not in reachable:
+                        reachable.add(fact)
+                        _add_fact(index, fact)
+                        changed = True
+    ops = [operators[key] for key in sorted(operators)]
+    return StripsProblem(ops, task.init, task.goal, frozenset(reachable))
+
+
+def load(domain_path, problem_path, bitset=True):
+    """Parse and ground a PDDL domain file and problem file. With bitset
+    the task is compiled to a strips.BitsetProblem with int states;
+    otherwise the StripsProblem over frozensets of facts is returned."""
+    with open(domain_path) as f:
+        domain = parse_domain(f.read())
+    with open(problem_path) as f:
+        task = parse_problem(f.read())
+    problem = ground(domain, task)
+    if bitset:
+        import strips
+        problem = strips.BitsetProblem(problem)
+    return problem
@@ -0,0 +1,218 @@
+"""Post-search plan improvement for watering plans.
+
+GBFS finds plans quickly but often longer than optimal. improve_plan
+shortens a plan (a list of action strings) without searching the whole
+problem again:
+
+  * cycles: when the plan revisits a state, the actions in between go;
+  * detours: a robot that walks away and comes back to the same cell
+    without loading or pouring may simply stay, if the other robots'
+    actions are still legal in the resulting order, or after commuting
+    the other robots' actions of that stretch before or after it (the
+    only explicit reordering; splices reorder within their window);
+  * splicing: between states i and j of the plan, a bounded A* looks for
+    a path shorter than j - i and replaces that stretch with it;
+  * tails: after each LOAD or POUR, a bounded A* with h_astar looks for a
+    shorter way to any goal state than the rest of the plan.
+
+Every changed plan is replayed with ex1.check_plan before it is kept.
+bench_plan_improve.py measures the gains against GBFS and A*."""
+
+import heapq
+
+import ex1
+import search
+
+from utils import infinity
+
+
+def replay(problem, plan):
+    """The states visited by plan, starting with problem.initial, or None if
+    an action is not applicable."""
+    states = [problem.initial]
+    for action in plan:
+        for name, state in problem.successor(states[-1]):
+            if name == action:
+                states.append(state)
+                break
+        else:
+            return None
+    return states
+
+
+def remove_cycles(states, plan):
+    """Cut every stretch of plan between two visits of the same state.
+    Returns the new (states, plan)."""
+    kept_states, kept_plan = [states[0]], []
+    index = {states[0]: 0}
+    for action, state in zip(plan, states[1:]):
+        k = index.get(state)
+        if k is not None:
+            for s in kept_states[k + 1:]:
+                del index[s]
+            del kept_states[k + 1:]
+            del kept_plan[k:]
+        else:
+            index[state] = len(kept_states)
+            kept_states.append(state)
+            kept_plan.append(action)
+    return kept_states, kept_plan
+
+
+def remove_detours(game, plan, reorder=True):
+    """Drop the moves of a robot between two visits of the same cell when
+    it neither loads nor pours in between, as long as the plan stays valid.
+    The other robots' actions keep their order, so this also removes loops
+    that are interleaved with other robots' work.
+
+    A loop is often there to let another robot pass. With reorder, if the
+    plain removal is invalid, the other robots' actions inside the loop are
+    commuted as one block to the nearest position before or after it
+    where the plan without the loop is valid, so the robot need not move
+    out of the way."""
+    deltas = dict((name, (dr, dc)) for name, dr, dc in ex1.MOVES)
+    improved = True
+    while improved:
+        improved = False
+        for rid, (r, c, _, _) in sorted(game["Robots"].items()):
+            suffix = "{%d}" % rid
+            seen = {(r, c): -1}
+            cell = (r, c)
+            for i, action in enumerate(plan):
+                if not action.endswith(suffix):
+                    continue
+                name = action[:-len(suffix)]
+                if name not in deltas:
+                    seen = {cell: i}
+                    continue
+                cell = (cell[0] + deltas[name][0], cell[1] + deltas[name][1])
+                if cell in seen:
+                    candidate = _without_loop(game, plan, seen[cell], i, suffix, reorder)
+                    if candidate is not None:
+                        plan = candidate
+                        improved = True
+                        break
+                seen[cell] = i
+            if improved:
+                break
+    return plan
+
+
+def _without_loop(game, plan, start, end, suffix, reorder):
+    """plan without the actions of suffix's robot in plan[start + 1:end + 1],
+    if that is valid; with reorder, also with the other actions of that
+    stretch moved before or after it. None if nothing is valid."""
+    candidate = [a for k, a in enumerate(plan) if not (start < k <= end and a.endswith(suffix))]
+    if ex1.check_plan(game, candidate):
+        return candidate
+    if not reorder:
+        return None
+    others = [a for a in plan[start + 1:end + 1] if not a.endswith(suffix)]
+    if not others:
+        return None
+    rest = plan[:start + 1] + plan[end + 1:]
+    for distance in range(1, len(rest) + 1):
+        for position in (start + 1 - distance, start + distance):
+            if 0 <= position <= len(rest):
+                candidate = rest[:position] + others + rest[position:]
+                if ex1.check_plan(game, candidate):
+                    return candidate
+    return None
+
+
+def _estimate(state, goal):
+    """A lower bound on the actions from state to the exact state goal: the
+    Manhattan distance of every robot to its goal cell plus the LOADs and
+    POURs still to happen, or infinity if water would have to come back."""
+    robots, taps, plants = state
+    goal_robots, goal_taps, goal_plants = goal
+    steps = 0
+    for (r, c, _), (gr, gc, _) in zip(robots, goal_robots):
+        steps += abs(r - gr) + abs(c - gc)
+    for have, want in zip(taps + plants, goal_taps + goal_plants):
+        if have < want:
+            return infinity
+        steps += have - want
+    return steps
+
+
+def shortcut(problem, start, goal, bound, limit=2000):
+    """A list of actions taking start to the state goal in fewer than bound
+    steps, found by A* with at most limit expansions, or None. With goal
+    None any goal state of problem will do, estimated with h_astar."""
+    if goal is None:
+        estimate = lambda state: problem.h_astar(search.Node(state))
+        reached = problem.goal_test
+    else:
+        estimate = lambda state: _estimate(state, goal)
+        reached = lambda state: state == goal
+    tick = 0
+    fringe = [(estimate(start), 0, tick, start, None)]
+    best = {start: 0}
+    expanded = 0
+    while fringe and expanded < limit:
+        f, g, _, state, path = heapq.heappop(fringe)
+        if reached(state):
+            actions = []
+            while path is not None:
+                action, path = path
+                actions.append(action)
+            return actions[::-1]
+        if g > best.get(state, infinity):
+            continue
+        expanded += 1
+        for action, child in problem.successor(state):
+            cost = g + 1
+            if cost >= best.get(child, infinity):
+                continue
+            f = cost + estimate(child)
+            if f >= bound:
+                continue
+            best[child] = cost
+            tick += 1
+            heapq.heappush(fringe, (f, cost, tick, child, (action, path)))
+    return None
+
+
+def improve_plan(game, plan, window=12, limit=2000):
+    """Return a valid plan for game no longer than plan. Plans with macro
+    actions are flattened first; an invalid plan is returned unchanged.
+    Local searches that failed are remembered by their end states and not
+    repeated when a later round meets the same pair again."""
+    plan = ex1.expand_macro_plan(plan)
+    if not ex1.check_plan(game, plan):
+        return plan
+    problem = ex1.WateringProblem(game)
+    failed = set()
+    improved = True
+    while improved:
+        improved = False
+        states, candidate = remove_cycles(replay(problem, plan), plan)
+        candidate = remove_detours(game, candidate)
+        if len(candidate) < len(plan) and ex1.check_plan(game, candidate):
+            plan = candidate
+        states = replay(problem, plan)
+        i = 0
+        while i < len(plan) - 1:
+            for j in range(min(len(plan), i + window), i + 1, -1):
+                if (states[i], states[j]) in failed:
+                    continue
+                path = shortcut(problem, states[i], states[j], j - i, limit)
+                candidate = path is not None and plan[:i] + path + plan[j:]
+                if candidate and ex1.check_plan(game, candidate):
+                    plan = candidate
+                    states = replay(problem, plan)
+                    improved = True
+                    break
+                failed.add((states[i], states[j]))
+            else:
+                i += 1
+        for i in range(len(plan) - 1):
+            if plan[i].startswith(("LOAD", "POUR")) and (states[i + 1], None) not in failed:
+                path = shortcut(problem, states[i + 1], None, len(plan) - i - 1, limit)
+                if path is not None and ex1.check_plan(game, plan[:i + 1] + path):
+                    plan = plan[:i + 1] + path
+                    improved = True
+                    break
+                failed.add((states[i + 1], None))
+    return plan
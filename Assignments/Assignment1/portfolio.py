@@ -0,0 +1,110 @@
+"""Algorithm portfolio: race several searches on one watering instance.
+
+Every member runs in its own forked process with optional CPU-time and
+address-space limits. In 'first' mode the first valid plan wins and the
+other members are cancelled; in 'best' mode the portfolio waits for all
+members (or the deadline) and keeps the shortest valid plan. Plans are
+replayed with ex1.check_plan before they are accepted."""
+
+import time
+
+import ex1
+import harness
+import search
+
+
+class Member:
+    """A portfolio member: a named search function taking the problem and
+    returning (node, expanded) like graph_search. cpu_limit is in seconds and
+    mem_limit in megabytes; None means unlimited."""
+
+    def __init__(self, name, search, cpu_limit=None, mem_limit=None):
+        self.name = name
+        self.search = search
+        self.cpu_limit = cpu_limit
+        self.mem_limit = mem_limit
+
+    def __repr__(self):
+        return "<Member %s>" % self.name
+
+
+def default_members(cpu_limit=None, mem_limit=None):
+    """A*, greedy best-first and weighted A* with w = 1.5, 2 and 4."""
+    members = [
+        Member('astar', lambda p: search.astar_search(p, p.h_astar)),
+        Member('gbfs', lambda p: search.greedy_best_first_graph_search(p, p.h_gbfs)),
+    ]
+    for w in (1.5, 2, 4):
+        members.append(Member('wastar%g' % w,
+                              lambda p, w=w: search.weighted_astar_search(p, p.h_astar, w)))
+    for m in members:
+        m.cpu_limit, m.mem_limit = cpu_limit, mem_limit
+    return members
+
+
+def run_portfolio(game, members=None, mode='first', deadline=None, macro=False):
+    """Race members on game. Returns a dict with the winning member name (or
+    None), its primitive plan and a per-member report of status, plan length,
+    expansions and wall time."""
+    members = members or default_members()
+    problem = ex1.create_watering_problem(game, macro)
+    report = dict((m.name, {"status": "running", "length": None,
+                            "expanded": None, "time": None}) for m in members)
+    start = time.time()
+    runs = dict((m.name, harness.Forked(_run_member, m, problem)) for m in members)
+    winner, plan = None, None
+    try:
+        pending = set(runs)
+        while pending and not (mode == 'first' and winner is not None):
+            left = None
+            if deadline is not None:
+                left = deadline - (time.time() - start)
+                if left <= 0:
+                    break
+            ready = harness.wait([runs[name] for name in pending], left)
+            for name in [name for name in sorted(pending) if runs[name] in ready]:
+                pending.discard(name)
+                try:
+                    solution, expanded, elapsed = runs[name].receive()
+                except EOFError:
+                    # Exited without a result, e.g. on its CPU or memory limit.
+                    report[name]["status"] = "killed"
+                    continue
+                report[name].update(expanded=expanded, time=elapsed)
+                if solution is None:
+                    report[name]["status"] = "no solution"
+                    continue
+                if not ex1.check_plan(game, solution):
+                    report[name]["status"] = "invalid"
+                    continue
+                report[name].update(status="solved", length=len(solution))
+                if plan is None or len(solution) < len(plan):
+                    winner, plan = name, solution
+                if mode == 'first':
+                    break
+    finally:
+        for name, run in runs.items():
+            if report[name]["status"] == "running":
+                report[name]["status"] = "cancelled"
+            run.stop()
+    if winner is not None:
+        report[winner]["status"] = "won"
+    return {"winner": winner, "plan": plan, "members": report}
+
+
+def _run_member(member, problem, conn):
+    import resource
+    if member.cpu_limit is not None:
+        resource.setrlimit(resource.RLIMIT_CPU, (member.cpu_limit, member.cpu_limit))
+    if member.mem_limit is not None:
+        limit = member.mem_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    start = time.time()
+    result = member.search(problem)
+    elapsed = time.time() - start
+    if result is None:
+        conn.send((None, None, elapsed))
+    else:
+        node, expanded = result
+        solution = ex1.expand_macro_plan([n.action for n in node.path()[::-1]][1:])
+        conn.send((solution, expanded, elapsed))
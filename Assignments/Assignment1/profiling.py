@@ -0,0 +1,172 @@
+"""Profiling helpers for the ex1_check harness.
+
+profile_call runs one function under a profiler and writes PREFIX.pstats
+(loadable with pstats.Stats) and PREFIX.collapsed, one 'frame;frame;...
+count' line per distinct stack, ready for flamegraph.pl or speedscope.
+Two modes:
+
+  cprofile  deterministic cProfile. cProfile only records caller-callee
+            edges, so the stacks are rebuilt from that call graph by
+            collapsed_stats, in microseconds of own time.
+  sample    only the sampler: a SIGPROF interval timer records the Python
+            stack every interval seconds of CPU time, which costs far less
+            than tracing every call. The pstats file is built from the
+            samples, so call counts there are sample counts.
+
+summarize prints the search hot spots (graph_search, Node.expand,
+PriorityQueue.append, successor and the heuristics) and the top functions
+by own time for one or more pstats files."""
+
+import collections
+import cProfile
+import marshal
+import os
+import pstats
+import signal
+
+MODES = ('cprofile', 'sample')
+
+# (file name, function name) of the functions summarize always reports;
+# a None file matches any module.
+WATCHED = (('search.py', 'graph_search'), ('search.py', 'expand'),
+           ('utils.py', 'append'), (None, 'successor'), (None, 'h_astar'),
+           (None, 'h_gbfs'))
+
+
+class SamplingProfiler:
+    """Collects Python stacks on SIGPROF. Only usable from the main thread
+    on platforms with setitimer."""
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._previous = None
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename == __file__:
+                break
+            stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        if stack:
+            self.stacks[tuple(reversed(stack))] += 1
+
+    def start(self):
+        self._previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous or signal.SIG_DFL)
+
+    def collapsed(self):
+        "The samples as collapsed-stack lines, heaviest first."
+        label = lambda f: "%s:%s:%d" % (os.path.basename(f[0]), f[2], f[1])
+        return ["%s %d" % (";".join(map(label, stack)), count)
+                for stack, count in self.stacks.most_common()]
+
+    def stats(self):
+        """The samples as a pstats dict: own and cumulative times are the
+        sample counts times the interval."""
+        stats = {}
+        for stack, count in self.stacks.items():
+            seconds = count * self.interval
+            for func in set(stack):
+                cc, nc, tt, ct, callers = stats.get(func, (0, 0, 0.0, 0.0, {}))
+                stats[func] = (cc + count, nc + count, tt, ct + seconds, callers)
+            cc, nc, tt, ct, callers = stats[stack[-1]]
+            stats[stack[-1]] = (cc, nc, tt + seconds, ct, callers)
+            for caller, callee in set(zip(stack, stack[1:])):
+                edges = stats[callee][4]
+                n, _, t, c = edges.get(caller, (0, 0, 0.0, 0.0))
+                edges[caller] = (n + count, n + count, t, c + seconds)
+        return stats
+
+
+def collapsed_stats(stats, floor=1e-6):
+    """Collapsed-stack lines, heaviest first, from a pstats dict. The own
+    time of a function is split among the stacks that reach it in
+    proportion to the cumulative time of each caller edge; recursion is cut
+    where a function repeats and stacks below floor seconds are dropped.
+    Counts are microseconds."""
+    callees = collections.defaultdict(list)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+    lines = collections.Counter()
+
+    def walk(stack, seconds):
+        func = stack[-1]
+        _, _, tt, ct, _ = stats[func]
+        share = seconds / ct if ct > 0 else 0.0
+        if tt * share >= floor:
+            lines[stack] += tt * share
+        for callee, edge_seconds in callees[func]:
+            if callee not in stack and edge_seconds * share >= floor:
+                walk(stack + (callee,), edge_seconds * share)
+
+    for func, (_, _, _, ct, callers) in stats.items():
+        if not callers:
+            walk((func,), ct)
+    label = lambda f: "%s:%s:%d" % (os.path.basename(f[0]), f[2], f[1])
+    return ["%s %d" % (";".join(map(label, stack)), round(seconds * 1e6))
+            for stack, seconds in lines.most_common() if round(seconds * 1e6)]
+
+
+def profile_call(fn, mode='cprofile', prefix='profile', interval=0.001):
+    """Call fn() under the profiler of mode and write PREFIX.pstats and
+    PREFIX.collapsed. Returns fn's result."""
+    if mode not in MODES:
+        raise ValueError("unknown profile mode %r, expected one of %s" % (mode, MODES))
+    directory = os.path.dirname(prefix)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return fn()
+        finally:
+            profiler.disable()
+            profiler.dump_stats(prefix + '.pstats')
+            profiler.create_stats()
+            with open(prefix + '.collapsed', 'w') as f:
+                f.write("\n".join(collapsed_stats(profiler.stats)) + "\n")
+    sampler = SamplingProfiler(interval)
+    sampler.start()
+    try:
+        return fn()
+    finally:
+        sampler.stop()
+        with open(prefix + '.pstats', 'wb') as f:
+            marshal.dump(sampler.stats(), f)
+        with open(prefix + '.collapsed', 'w') as f:
+            f.write("\n".join(sampler.collapsed()) + "\n")
+
+
+def summarize(paths, top=15):
+    """Print the watched search functions and the top functions by own time
+    over the pstats files in paths."""
+    stats = None
+    for path in paths:
+        try:
+            run = pstats.Stats(path)
+        except TypeError:
+            continue  # A sampled run too short to take any sample.
+        if stats is None:
+            stats = run
+        else:
+            stats.add(run)
+    rows = stats.stats if stats is not None else {}
+    print("search hot spots (calls, own s, cumulative s):")
+    for filename, name in WATCHED:
+        for func, (_, nc, tt, ct, _) in sorted(rows.items()):
+            if func[2] == name and (filename is None or os.path.basename(func[0]) == filename):
+                print("  %-38s %10d %9.3f %9.3f" % (
+                    "%s:%s" % (os.path.basename(func[0]), name), nc, tt, ct))
+    print("top %d functions by own time:" % top)
+    for func, (_, nc, tt, ct, _) in sorted(rows.items(), key=lambda r: -r[1][2])[:top]:
+        print("  %-38s %10d %9.3f %9.3f" % (
+            "%s:%s:%d" % (os.path.basename(func[0]), func[2], func[1]), nc, tt, ct))
@@ -0,0 +1,200 @@
+"""Delete-relaxation heuristics for grounded STRIPS tasks.
+
+RelaxedHeuristics precomputes the relaxed planning graph of a
+strips.BitsetProblem once (precondition and add lists per operator, and the
+operators waiting on each fact) and evaluates h_max, h_add, h_FF and LM-cut
+on it with counter-based propagation: every operator keeps a count of its
+unreached preconditions and fires when the count drops to zero. The per-fact
+and per-operator arrays are allocated once and reset in place on every call.
+
+    problem = pddl.load('Recs/domain.pddl', 'problem.pddl')
+    h = relaxation.RelaxedHeuristics(problem)
+    node, expanded = search.astar_search(problem, h.h_lmcut)
+"""
+
+import heapq
+
+from utils import infinity
+from strips import _bits
+
+
+class RelaxedHeuristics:
+    """h_max and LM-cut are admissible; h_add and h_FF are not, and are meant
+    for greedy search. All of them return infinity on relaxed dead ends.
+    Every operator costs 1, as in search.Problem.path_cost."""
+
+    def __init__(self, problem):
+        nfacts = len(problem.facts)
+        self.pre = [_bits(pre) for _, pre, _, _ in problem.operators]
+        self.add = [_bits(add) for _, _, add, _ in problem.operators]
+        nops = len(self.pre)
+        self.pre_of = [[] for _ in range(nfacts)]
+        self.add_of = [[] for _ in range(nfacts)]
+        for o in range(nops):
+            for f in self.pre[o]:
+                self.pre_of[f].append(o)
+            for f in self.add[o]:
+                self.add_of[f].append(o)
+        self.no_pre = [o for o in range(nops) if not self.pre[o]]
+        self.npre = [len(p) for p in self.pre]
+        self.goal = _bits(problem.goal)
+        self.is_goal = [False] * nfacts
+        for g in self.goal:
+            self.is_goal[g] = True
+        self.unit = [1] * nops
+        # Work arrays, reset in place by every evaluation.
+        self.inf_facts = [infinity] * nfacts
+        self.zero_ops = [0] * nops
+        self.cost = [infinity] * nfacts
+        self.supporter = [-1] * nfacts
+        self.unsat = [0] * nops
+        self.value = [0] * nops
+        self.choice = [-1] * nops
+        self.lm_cost = [1] * nops
+        self.mark = [0] * nops
+        self.zone = [0] * nfacts
+        self.stamp = 0
+        self.heap = []
+
+    def _explore(self, state, use_max, op_cost, stop_at_goal):
+        """Propagate fact costs from state through the relaxed graph. Sets
+        self.cost and self.supporter; an operator's value is the max (h_max)
+        or sum (h_add) of its precondition costs. Facts are settled in order
+        of cost, so the precondition that fires an operator, kept in
+        self.choice, is one of its most expensive ones."""
+        cost, supporter, unsat, value = self.cost, self.supporter, self.unsat, self.value
+        choice = self.choice
+        pre_of, add, is_goal = self.pre_of, self.add, self.is_goal
+        cost[:] = self.inf_facts
+        unsat[:] = self.npre
+        value[:] = self.zero_ops
+        heap = self.heap
+        del heap[:]
+        for f in _bits(state):
+            cost[f] = 0
+            supporter[f] = -1
+            heap.append((0, f))
+        for o in self.no_pre:
+            v = op_cost[o]
+            for g in add[o]:
+                if v < cost[g]:
+                    cost[g] = v
+                    supporter[g] = o
+                    heapq.heappush(heap, (v, g))
+        goals_left = len(self.goal)
+        while heap:
+            c, f = heapq.heappop(heap)
+            if c > cost[f]:
+                continue
+            if is_goal[f]:
+                goals_left -= 1
+                if stop_at_goal and goals_left == 0:
+                    break
+            for o in pre_of[f]:
+                if use_max:
+                    if c > value[o]:
+                        value[o] = c
+                else:
+                    value[o] += c
+                unsat[o] -= 1
+                if unsat[o] == 0:
+                    choice[o] = f
+                    v = value[o] + op_cost[o]
+                    for g in add[o]:
+                        if v < cost[g]:
+                            cost[g] = v
+                            supporter[g] = o
+                            heapq.heappush(heap, (v, g))
+
+    def h_max(self, node):
+        self._explore(node.state, True, self.unit, True)
+        return max([self.cost[g] for g in self.goal] or [0])
+
+    def h_add(self, node):
+        self._explore(node.state, False, self.unit, True)
+        return sum(self.cost[g] for g in self.goal)
+
+    def h_ff(self, node):
+        """The number of operators in a relaxed plan extracted from the h_add
+        best supporters."""
+        self._explore(node.state, False, self.unit, True)
+        cost, supporter, mark, pre = self.cost, self.supporter, self.mark, self.pre
+        self.stamp += 1
+        stamp = self.stamp
+        stack = list(self.goal)
+        size = 0
+        while stack:
+            f = stack.pop()
+            if cost[f] == infinity:
+                return infinity
+            o = supporter[f]
+            if cost[f] == 0 or mark[o] == stamp:
+                continue
+            mark[o] = stamp
+            size += 1
+            stack.extend(pre[o])
+        return size
+
+    def h_lmcut(self, node):
+        """LM-cut: repeatedly compute h_max, cut the justification graph in
+        front of the goal zone and pay for the cheapest operator of the cut."""
+        state = node.state
+        op_cost = self.lm_cost
+        op_cost[:] = self.unit
+        cost, unsat, choice, add, add_of, zone = (self.cost, self.unsat, self.choice,
+                                                   self.add, self.add_of, self.zone)
+        h = 0
+        while True:
+            self._explore(state, True, op_cost, False)
+            if not self.goal:
+                return h
+            top = max(self.goal, key=lambda g: cost[g])
+            if cost[top] == infinity:
+                return infinity
+            if cost[top] == 0:
+                return h
+            # Justification graph: every reached operator links its choice
+            # precondition to its add effects. The goal zone holds the facts
+            # that reach the costliest goal through zero-cost operators.
+            self.stamp += 1
+            goal_mark = self.stamp
+            zone[top] = goal_mark
+            stack = [top]
+            while stack:
+                f = stack.pop()
+                for o in add_of[f]:
+                    if op_cost[o] == 0 and unsat[o] == 0 and self.npre[o]:
+                        p = choice[o]
+                        if zone[p] != goal_mark:
+                            zone[p] = goal_mark
+                            stack.append(p)
+            # Forward from the state without entering the goal zone; every
+            # operator that would enter it belongs to the cut.
+            self.stamp += 1
+            seen = self.stamp
+            cut = set()
+            stack = []
+            for f in _bits(state):
+                if zone[f] != goal_mark:
+                    zone[f] = seen
+                    stack.append(f)
+            frontier = list(self.no_pre)
+            while stack or frontier:
+                if frontier:
+                    o = frontier.pop()
+                else:
+                    f = stack.pop()
+                    for o in self.pre_of[f]:
+                        if unsat[o] == 0 and choice[o] == f:
+                            frontier.append(o)
+                    continue
+                for g in add[o]:
+                    if zone[g] == goal_mark:
+                        cut.add(o)
+                    elif zone[g] != seen:
+                        zone[g] = seen
+                        stack.append(g)
+            m = min(op_cost[o] for o in cut)
+            h += m
+            for o in cut:
+                op_cost[o] -= m
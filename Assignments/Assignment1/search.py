@@ -4,9 +4,9 @@ The way to use this code is to subclass Problem to create a class of problems,
 then create problem instances and solve them with calls to the various search
 functions."""
 
-from __future__ import generators
-from utils import *
-import math, random, sys, time, bisect, string
+from utils import (infinity, update, memoize, argmax, if_, probability,
+                   Stack, FIFOQueue, PriorityQueue, BucketQueue)
+import collections, heapq, math, sys
 
 
 # ______________________________________________________________________________
@@ -45,6 +45,12 @@ class Problem:
         and action. The default method costs 1 for every step in the path."""
         return c + 1
 
+    def atoms(self, state):
+        """Return the atoms (hashable facts) that hold in state, for the
+        novelty tests of width-based search. The default treats the state
+        itself as a collection of atoms, e.g. a frozenset of facts."""
+        return state
+
     def value(self):
         """For optimization problems, each state has a value.  Hill-climbing
         and related algorithms try to maximize this value."""
@@ -132,28 +138,194 @@ def depth_first_tree_search(problem):
     return tree_search(problem, Stack())
 
 
-def graph_search(problem, fringe):
+def graph_search(problem, fringe, checkpoint=None):
     """Search through the successors of a problem to find a goal.
     The argument fringe should be an empty queue.
-    If two paths reach a state, only use the best one. [Fig. 3.18]"""
+    If two paths reach a state, only use the best one. [Fig. 3.18]
+    With a Checkpoint the search resumes from its file if there is one and
+    snapshots itself there every checkpoint.interval seconds."""
     closed = {}
-    expanded = 0
-   
-    fringe.append(Node(problem.initial))
+    expanded = None
+    if checkpoint is not None and checkpoint.exists():
+        expanded = checkpoint.resume(fringe, closed)
+    if expanded is None:
+        expanded = 0
+        root = Node(problem.initial)
+        if checkpoint is not None:
+            checkpoint.generated(None, [root])
+        fringe.append(root)
     while fringe:
         node = fringe.pop()
         if problem.goal_test(node.state):
+            if checkpoint is not None:
+                checkpoint.remove()
             return node, expanded
         if node.state not in closed:
             closed[node.state] = True
-            fringe.extend(node.expand(problem))
+            children = node.expand(problem)
+            if checkpoint is not None:
+                checkpoint.generated(node, children)
+            fringe.extend(children)
             expanded += 1
+            if checkpoint is not None and checkpoint.due(expanded):
+                checkpoint.save(fringe, expanded)
+    if checkpoint is not None:
+        checkpoint.remove()
     return None
 
 
+class Checkpoint:
+    """Incremental snapshots of a graph_search in an append-only file.
+
+    Every node gets an integer id when it is generated. A snapshot appends
+    one length-prefixed pickle record with only what changed since the
+    previous one: the new nodes as (id, parent id, action, state, g, f)
+    rows, the ids of the newly closed nodes, and the ids of the fringe in
+    queue order. Resuming replays the records, rebuilds the nodes with
+    their parent links and cached f values and refills the fringe in the
+    same order, so the search goes on exactly as it would have and returns
+    the same solution. The record also keeps the generator state of a
+    'random' BucketQueue, so random tie-breaking resumes the same way. A
+    record cut short by a crash is cut off the file on resume. The file is
+    removed when the search ends."""
+
+    def __init__(self, path, interval=60.0):
+        import time
+        self.path = path
+        self.interval = interval
+        self.next_id = 0
+        self.fresh = []
+        self.newly_closed = []
+        self.last = time.time()
+
+    def exists(self):
+        import os
+        return os.path.exists(self.path)
+
+    def generated(self, parent, children):
+        "Give ids to children and note parent, if any, as closed."
+        if parent is not None:
+            self.newly_closed.append(parent.checkpoint_id)
+        for child in children:
+            child.checkpoint_id = self.next_id
+            self.next_id += 1
+        self.fresh.extend(children)
+
+    def due(self, expanded):
+        # Looking at the clock every 256 expansions keeps this off the profile.
+        if expanded % 256:
+            return False
+        import time
+        return time.time() - self.last >= self.interval
+
+    def save(self, fringe, expanded):
+        "Append one record and sync it to disk."
+        import array, os, pickle, struct, time
+        rows = [(n.checkpoint_id, n.parent.checkpoint_id if n.parent else -1, n.action,
+                 n.state, n.path_cost, getattr(n, 'f', None)) for n in self.fresh]
+        fringe_ids = array.array('q', [n.checkpoint_id for n in _fringe_items(fringe)])
+        random_state = fringe.random.getstate() if hasattr(fringe, 'random') else None
+        record = pickle.dumps((rows, array.array('q', self.newly_closed).tobytes(),
+                               fringe_ids.tobytes(), expanded, self.next_id, random_state),
+                              pickle.HIGHEST_PROTOCOL)
+        with open(self.path, 'ab') as f:
+            f.write(struct.pack('<Q', len(record)) + record)
+            f.flush()
+            os.fsync(f.fileno())
+        self.fresh, self.newly_closed = [], []
+        self.last = time.time()
+
+    def resume(self, fringe, closed):
+        """Rebuild the search of the latest complete record: fill fringe and
+        closed and return the expansion count, or None if the file holds no
+        complete record. A partial record at the end is truncated away, so
+        that later records follow the last good one."""
+        import array, pickle, struct, time
+        nodes, closed_ids, fringe_ids, expanded, random_state = {}, [], [], 0, None
+        with open(self.path, 'r+b') as f:
+            end = 0
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    break
+                size = struct.unpack('<Q', header)[0]
+                record = f.read(size)
+                if len(record) < size:
+                    break
+                try:
+                    (rows, closed_bytes, fringe_bytes, expanded, self.next_id,
+                     random_state) = pickle.loads(record)
+                except Exception:
+                    break  # Cut short by a crash while writing.
+                end = f.tell()
+                for ident, parent, action, state, cost, f_value in rows:
+                    node = Node(state, nodes[parent] if parent >= 0 else None, action, cost)
+                    node.checkpoint_id = ident
+                    if f_value is not None:
+                        node.f = f_value
+                    nodes[ident] = node
+                closed_ids.extend(array.array('q', closed_bytes))
+                fringe_ids = array.array('q', fringe_bytes)
+            f.truncate(end)
+        if not end:
+            return None
+        for ident in closed_ids:
+            closed[nodes[ident].state] = True
+        _fill_fringe(fringe, [nodes[ident] for ident in fringe_ids])
+        if random_state is not None:
+            fringe.random.setstate(random_state)
+        # Later snapshots only add what is new, so keep appending to this file.
+        self.fresh, self.newly_closed = [], []
+        self.last = time.time()
+        return expanded
+
+    def remove(self):
+        import os
+        if self.exists():
+            os.remove(self.path)
+
+
+def _fringe_items(fringe):
+    "The nodes of a Stack, FIFOQueue or PriorityQueue in queue order."
+    if isinstance(fringe, PriorityQueue):
+        return [item for _, item in fringe.A]
+    if isinstance(fringe, FIFOQueue):
+        return list(fringe.A)
+    if isinstance(fringe, BucketQueue):
+        return fringe.items()
+    return list(fringe)
+
+
+def _fill_fringe(fringe, nodes):
+    "Put nodes back in an empty fringe in the order of _fringe_items."
+    if isinstance(fringe, PriorityQueue):
+        fringe.A = [(node.f, node) for node in nodes]
+    else:
+        fringe.extend(nodes)
+
+
 def breadth_first_graph_search(problem):
-    "Search the shallowest nodes in the search tree first. [p 74]"
-    return graph_search(problem, FIFOQueue())
+    """Search the shallowest nodes in the search tree first. [p 74]
+    Children are goal-tested when they are generated, which saves expanding
+    the last layer, and a visited set of states replaces the closed dict.
+    Returns (node, expanded) like graph_search, or None."""
+    node = Node(problem.initial)
+    if problem.goal_test(node.state):
+        return node, 0
+    fringe = FIFOQueue()
+    fringe.append(node)
+    visited = {node.state}
+    expanded = 0
+    while fringe:
+        node = fringe.pop()
+        expanded += 1
+        for child in node.expand(problem):
+            if child.state not in visited:
+                if problem.goal_test(child.state):
+                    return child, expanded
+                visited.add(child.state)
+                fringe.append(child)
+    return None
 
 
 def depth_first_graph_search(problem):
@@ -197,16 +369,20 @@ def iterative_deepening_search(problem):
 # ______________________________________________________________________________
 # Informed (Heuristic) Search
 
-def best_first_graph_search(problem, f):
+def best_first_graph_search(problem, f, checkpoint=None, tie=None, seed=None):
     """Search the nodes with the lowest f scores first.
     You specify the function f(node) that you want to minimize; for example,
     if f is a heuristic estimate to the goal, then we have greedy best
     first search; if f is node.depth then we have depth-first search.
     There is a subtlety: the line "f = memoize(f, 'f')" means that the f
     values will be cached on the nodes as they are computed. So after doing
-    a best first search you can examine the f values of the path returned."""
+    a best first search you can examine the f values of the path returned.
+    With tie set, the fringe is a BucketQueue that breaks ties among equal
+    f values by that policy ('fifo', 'lifo', 'random' with seed, 'high_g',
+    'low_h' or a key function); otherwise ties fall to the PriorityQueue."""
     f = memoize(f, 'f')
-    return graph_search(problem, PriorityQueue(min, f))
+    fringe = PriorityQueue(min, f) if tie is None else BucketQueue(f, tie, seed)
+    return graph_search(problem, fringe, checkpoint)
 
 
 greedy_best_first_graph_search = best_first_graph_search
@@ -214,18 +390,133 @@ greedy_best_first_graph_search = best_first_graph_search
 
 # Greedy best-first search is accomplished by specifying f(n) = h(n).
 
-def astar_search(problem, h=None):
+def astar_search(problem, h=None, checkpoint=None, tie=None, seed=None):
     """A* search is best-first graph search with f(n) = g(n)+h(n).
     You need to specify the h function when you call astar_search.
-    Uses the pathmax trick: f(n) = max(f(n), g(n)+h(n))."""
+    Uses the pathmax trick: f(n) = max(f(n), g(n)+h(n)).
+    checkpoint is an optional Checkpoint to snapshot to and resume from;
+    tie and seed choose a tie-breaking policy, see best_first_graph_search."""
     h = h or problem.h
 
     def f(n):
         return max(getattr(n, 'f', -infinity), n.path_cost + h(n))
 
+    return best_first_graph_search(problem, f, checkpoint, tie, seed)
+
+
+def weighted_astar_search(problem, h=None, w=2):
+    """Weighted A* search is best-first graph search with f(n) = g(n)+w*h(n).
+    With an admissible h the solution costs at most w times the optimum."""
+    h = h or problem.h
+
+    def f(n):
+        return n.path_cost + w * h(n)
+
     return best_first_graph_search(problem, f)
 
 
+def beam_search(problem, h=None, width=100, window=2, max_depth=10000):
+    """Breadth-first search that keeps only the width best nodes of each
+    layer, scored by h (problem.h_gbfs by default). Each layer is collected
+    in a bounded heap, and a child is dropped if its state is already in
+    the layer or in one of the previous window layers, so memory stays
+    O(width * window). Incomplete: returns (node, expanded), or None if the
+    beam dies out or passes max_depth layers."""
+    h = h or problem.h_gbfs
+    node = Node(problem.initial)
+    if problem.goal_test(node.state):
+        return node, 0
+    layer = [node]
+    recent = collections.deque([{node.state}], maxlen=window)
+    expanded = tick = 0
+    while layer and layer[0].depth < max_depth:
+        heap, states = [], {}
+        for node in layer:
+            expanded += 1
+            for child in node.expand(problem):
+                s = child.state
+                if s in states or any(s in seen for seen in recent):
+                    continue
+                if problem.goal_test(s):
+                    return child, expanded
+                tick += 1
+                # Max-heap on h through negation; the root is the worst kept.
+                item = (-h(child), tick, child)
+                if len(heap) < width:
+                    heapq.heappush(heap, item)
+                elif item[0] > heap[0][0]:
+                    del states[heapq.heapreplace(heap, item)[2].state]
+                else:
+                    continue
+                states[s] = True
+        layer = [item[2] for item in heap]
+        recent.append(set(states))
+    return None
+
+
+class NoveltyTable:
+    """The atoms seen so far, kept as one bit set (a Python int) per
+    partition key. Every distinct atom is given a bit the first time it is
+    seen, so a novelty test is a few integer operations."""
+
+    def __init__(self):
+        self.index = {}
+        self.seen = {}
+
+    def bits(self, atoms):
+        "Return the bit set of atoms, numbering atoms not seen before."
+        index = self.index
+        b = 0
+        for a in atoms:
+            i = index.get(a)
+            if i is None:
+                i = index[a] = len(index)
+            b |= 1 << i
+        return b
+
+    def novel(self, atoms, key=None):
+        """Record atoms under key and return True if one of them had not
+        been seen under that key before (novelty 1)."""
+        b = self.bits(atoms)
+        old = self.seen.get(key, 0)
+        self.seen[key] = old | b
+        return b & ~old != 0
+
+
+def best_first_width_search(problem, h=None):
+    """Best-first width search (BFWS): expand nodes with novelty 1 first,
+    breaking ties by h (problem.h_gbfs by default). A node has novelty 1 if
+    one of its atoms is new among the generated nodes with the same h value,
+    and 2 otherwise, so the search keeps exploring on heuristic plateaus
+    where plain GBFS sees only equal scores. Complete on finite problems;
+    returns (node, expanded), or None."""
+    h = h or problem.h_gbfs
+    table = NoveltyTable()
+    closed = set()
+    fringe = []
+    tick = expanded = 0
+    node = Node(problem.initial)
+    hval = h(node)
+    table.novel(problem.atoms(node.state), hval)
+    heapq.heappush(fringe, (1, hval, tick, node))
+    while fringe:
+        node = heapq.heappop(fringe)[3]
+        if problem.goal_test(node.state):
+            return node, expanded
+        if node.state in closed:
+            continue
+        closed.add(node.state)
+        expanded += 1
+        for child in node.expand(problem):
+            if child.state in closed:
+                continue
+            hval = h(child)
+            novelty = 1 if table.novel(problem.atoms(child.state), hval) else 2
+            tick += 1
+            heapq.heappush(fringe, (novelty, hval, tick, child))
+    return None
+
+
 # ______________________________________________________________________________
 ## Other search algorithms
 
@@ -271,6 +562,7 @@ def exp_schedule(k=20, lam=0.005, limit=100):
 
 def simulated_annealing(problem, schedule=exp_schedule()):
     "[Fig. 4.5]"
+    import random
     current = Node(problem.initial)
     for t in xrange(sys.maxint):
         T = schedule(t)
@@ -0,0 +1,90 @@
+"""Persistent solution cache for watering problems.
+
+Plans are stored in a local SQLite file under a content hash of the game
+(Size, Walls, Taps, Plants, Robots) and the algorithm name, so the same map
+is only searched once no matter where its dict came from. Entries are
+evicted least-recently-used first once the stored plans exceed max_bytes,
+and every cached plan is replayed with ex1.check_plan before it is returned."""
+
+import hashlib
+import json
+import sqlite3
+import time
+
+import ex1
+
+
+def canonical_key(game, algorithm):
+    """A hex digest that is equal for equal games, independent of the order
+    of the sets and dicts in the game description."""
+    canonical = [
+        list(game["Size"]),
+        sorted(list(cell) for cell in game["Walls"]),
+        sorted([r, c, w] for (r, c), w in game["Taps"].items()),
+        sorted([r, c, w] for (r, c), w in game["Plants"].items()),
+        sorted([rid] + list(data) for rid, data in game["Robots"].items()),
+        algorithm,
+    ]
+    return hashlib.sha256(json.dumps(canonical).encode()).hexdigest()
+
+
+class SolutionCache:
+    """An LRU cache of primitive plans in the SQLite file at path."""
+
+    def __init__(self, path='solutions.sqlite', max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS plans (key TEXT PRIMARY KEY,"
+                        " plan TEXT NOT NULL, size INTEGER NOT NULL,"
+                        " used REAL NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS plans_used ON plans (used)")
+
+    def get(self, game, algorithm):
+        """The cached plan for (game, algorithm), or None on a miss. A stored
+        plan that no longer replays is dropped and counted as a miss."""
+        key = canonical_key(game, algorithm)
+        row = self.db.execute("SELECT plan FROM plans WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            plan = json.loads(row[0])
+            if ex1.check_plan(game, plan):
+                with self.db:
+                    self.db.execute("UPDATE plans SET used = ? WHERE key = ?",
+                                    (time.time(), key))
+                self.hits += 1
+                return plan
+            with self.db:
+                self.db.execute("DELETE FROM plans WHERE key = ?", (key,))
+        self.misses += 1
+        return None
+
+    def put(self, game, algorithm, plan):
+        """Store plan and evict the least recently used plans over max_bytes."""
+        data = json.dumps(list(plan))
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?)",
+                            (canonical_key(game, algorithm), data, len(data), time.time()))
+            total = self.db.execute("SELECT TOTAL(size) FROM plans").fetchone()[0]
+            if total > self.max_bytes:
+                for key, size in self.db.execute(
+                        "SELECT key, size FROM plans ORDER BY used").fetchall():
+                    self.db.execute("DELETE FROM plans WHERE key = ?", (key,))
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+
+    def solve(self, game, algorithm, solver):
+        """Return the cached plan, or call solver(game) and cache its plan.
+        solver returns a list of action strings or None if unsolvable;
+        unsolvable results are not cached since they cannot be re-checked."""
+        plan = self.get(game, algorithm)
+        if plan is None:
+            plan = solver(game)
+            if plan is not None:
+                self.put(game, algorithm, plan)
+        return plan
+
+    def close(self):
+        self.db.close()
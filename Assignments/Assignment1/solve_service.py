@@ -0,0 +1,380 @@
+"""A local asyncio solve service for watering problems.
+
+Other programs send game dicts over a Unix socket (or a localhost TCP port)
+instead of starting a solver process per problem. The protocol is one JSON
+object per line in each direction:
+
+  {"id": 1, "game": {...}, "algorithm": "astar", "deadline": 5.0}
+      queue a problem; the game uses the JSON form of game_to_json and the
+      deadline (seconds, counted from arrival) defaults to the service's.
+  {"cancel": 1}
+      cancel a queued or running problem of this connection.
+  {"stats": true}
+      queue length, busy workers and counters.
+
+Every problem gets a {"id": 1, "status": "queued", "position": n} reply at
+once and a final reply later with status solved, no solution, timeout,
+cancelled or error, the plan, its length, expansions and the seconds spent
+waiting and solving. When the queue is full the problem is answered with
+status rejected right away, which is the back-pressure signal to slow
+down. Replies to different problems may come in any order.
+
+Problems are solved by a pool of forked worker processes that stay warm
+between problems. A problem that runs past its deadline or is cancelled
+kills its worker, which is replaced by a fresh fork.
+
+    python solve_service.py serve [--socket PATH | --port N] [--workers N] [--queue N]
+    python solve_service.py solve NAME [ALGORITHM] [--socket PATH | --port N]
+
+where NAME is an ex1_check problem."""
+
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+import ex1
+import search
+
+ALGORITHMS = {
+    'astar': lambda p: search.astar_search(p, p.h_astar),
+    'gbfs': lambda p: search.greedy_best_first_graph_search(p, p.h_gbfs),
+    'bfs': search.breadth_first_graph_search,
+}
+
+SOCKET_PATH = 'solve_service.sock'
+
+
+def game_to_json(game):
+    """A JSON-serializable form of a game dict: cells become [r, c] lists,
+    taps and plants [r, c, water] lists and robot ids strings."""
+    return {
+        "Size": list(game["Size"]),
+        "Walls": sorted(list(cell) for cell in game["Walls"]),
+        "Taps": sorted([r, c, w] for (r, c), w in game["Taps"].items()),
+        "Plants": sorted([r, c, w] for (r, c), w in game["Plants"].items()),
+        "Robots": dict((str(rid), list(data)) for rid, data in game["Robots"].items()),
+    }
+
+
+def game_from_json(data):
+    "The game dict of game_to_json's output."
+    return {
+        "Size": tuple(data["Size"]),
+        "Walls": set(tuple(cell) for cell in data["Walls"]),
+        "Taps": dict(((r, c), w) for r, c, w in data["Taps"]),
+        "Plants": dict(((r, c), w) for r, c, w in data["Plants"]),
+        "Robots": dict((int(rid), tuple(robot)) for rid, robot in data["Robots"].items()),
+    }
+
+
+def solve(game, algorithm):
+    """Solve one game. Returns (status, primitive plan, expanded)."""
+    problem = ex1.create_watering_problem(game)
+    result = ALGORITHMS[algorithm](problem)
+    if result is None:
+        return 'no solution', None, None
+    node, expanded = result
+    plan = ex1.expand_macro_plan([n.action for n in node.path()[::-1]][1:])
+    return 'solved', plan, expanded
+
+
+def _serve_jobs(conn):
+    "Worker process: solve (game, algorithm) jobs from conn until it closes."
+    while True:
+        try:
+            game, algorithm = conn.recv()
+        except EOFError:
+            return
+        start = time.time()
+        try:
+            status, plan, expanded = solve(game, algorithm)
+            conn.send((status, plan, expanded, None, time.time() - start))
+        except Exception as e:
+            conn.send(('error', None, None, repr(e), time.time() - start))
+
+
+class Worker:
+    """A warm solver process and the parent end of its pipe."""
+
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_serve_jobs, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    async def run(self, game, algorithm):
+        """Send one job and wait for its answer without blocking the loop.
+        Raises EOFError if the worker died."""
+        loop = asyncio.get_running_loop()
+        answer = loop.create_future()
+        fd = self.conn.fileno()
+
+        def readable():
+            loop.remove_reader(fd)
+            if answer.done():
+                return
+            try:
+                answer.set_result(self.conn.recv())
+            except EOFError as e:
+                answer.set_exception(e)
+
+        loop.add_reader(fd, readable)
+        try:
+            self.conn.send((game, algorithm))
+            return await answer
+        finally:
+            loop.remove_reader(fd)
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class Job:
+    """One queued problem and the connection its replies go to."""
+
+    def __init__(self, ident, game, algorithm, deadline, writer):
+        self.id = ident
+        self.game = game
+        self.algorithm = algorithm
+        self.deadline = deadline
+        self.writer = writer
+        self.arrived = time.time()
+        self.task = None
+        self.cancelled = False
+        self.done = False
+
+    def reply(self, **fields):
+        fields["id"] = self.id
+        if not self.writer.is_closing():
+            self.writer.write((json.dumps(fields) + "\n").encode())
+
+    def finish(self, status, plan=None, expanded=None, error=None, seconds=None, waited=None):
+        self.done = True
+        self.reply(status=status, plan=plan, length=None if plan is None else len(plan),
+                   expanded=expanded, error=error, seconds=seconds, waited=waited)
+
+
+class SolveService:
+    """The job queue, the worker pool and the connection handlers."""
+
+    def __init__(self, workers=None, queue_size=64, deadline=60.0):
+        self.size = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.deadline = deadline
+        self.ctx = multiprocessing.get_context('fork')
+        self.counts = dict((status, 0) for status in (
+            'solved', 'no solution', 'timeout', 'cancelled', 'error', 'rejected'))
+        self.busy = 0
+        # Queued jobs that are not cancelled; only these count as queue full.
+        self.waiting = 0
+        self.workers = []
+        self.queue = None
+        self.tasks = []
+        self.server = None
+
+    async def start(self, path=None, port=None):
+        """Fork the workers and listen on the Unix socket path, or on
+        127.0.0.1:port when a port is given."""
+        self.queue = asyncio.Queue()
+        self.workers = [Worker(self.ctx) for _ in range(self.size)]
+        self.tasks = [asyncio.ensure_future(self._dispatch(i)) for i in range(self.size)]
+        if port is not None:
+            self.server = await asyncio.start_server(self._client, '127.0.0.1', port)
+        else:
+            path = path or SOCKET_PATH
+            if os.path.exists(path):
+                os.unlink(path)
+            self.server = await asyncio.start_unix_server(self._client, path)
+        return self.server
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        for worker in self.workers:
+            worker.kill()
+
+    async def _dispatch(self, index):
+        "Feed queued jobs to worker index, one at a time."
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            if job.cancelled:
+                continue
+            self.waiting -= 1
+            waited = time.time() - job.arrived
+            remaining = job.deadline - waited
+            if remaining <= 0:
+                self._finish(job, 'timeout', waited=waited)
+                continue
+            self.busy += 1
+            start = loop.time()
+            job.task = asyncio.ensure_future(self.workers[index].run(job.game, job.algorithm))
+            try:
+                status, plan, expanded, error, seconds = await asyncio.wait_for(job.task, remaining)
+                self._finish(job, status, plan, expanded, error, seconds, waited)
+            except asyncio.TimeoutError:
+                self._replace(index)
+                self._finish(job, 'timeout', seconds=loop.time() - start, waited=waited)
+            except asyncio.CancelledError:
+                if not job.cancelled:
+                    raise  # The service is stopping.
+                self._replace(index)
+                self._finish(job, 'cancelled', seconds=loop.time() - start, waited=waited)
+            except EOFError:
+                self._replace(index)
+                self._finish(job, 'error', error="worker died", waited=waited)
+            finally:
+                self.busy -= 1
+
+    def _replace(self, index):
+        self.workers[index].kill()
+        self.workers[index] = Worker(self.ctx)
+
+    def _finish(self, job, status, *args, **kwargs):
+        self.counts[status] += 1
+        job.finish(status, *args, **kwargs)
+
+    def _cancel(self, job):
+        if job.done or job.cancelled:
+            return
+        job.cancelled = True
+        if job.task is not None:
+            job.task.cancel()  # _dispatch replies once the worker is gone.
+        else:
+            # _dispatch drops it from the queue when it gets there.
+            self.waiting -= 1
+            self._finish(job, 'cancelled', waited=time.time() - job.arrived)
+
+    async def _client(self, reader, writer):
+        "Read requests of one connection; its open jobs die with it."
+        jobs = {}
+        numbers = itertools.count(1)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    writer.write(b'{"status": "error", "error": "invalid JSON"}\n')
+                    continue
+                command = request if isinstance(request, dict) else {}
+                if "cancel" in command:
+                    job = jobs.get(command["cancel"])
+                    if job is not None:
+                        self._cancel(job)
+                elif "stats" in command:
+                    writer.write((json.dumps({"queued": self.waiting, "busy": self.busy,
+                                              "workers": self.size, "counts": self.counts})
+                                  + "\n").encode())
+                else:
+                    self._submit(request, jobs, numbers, writer)
+                    # Let idle dispatchers take the job before the next line.
+                    await asyncio.sleep(0)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for job in jobs.values():
+                self._cancel(job)
+            writer.close()
+
+    def _submit(self, request, jobs, numbers, writer):
+        ident, algorithm, deadline = next(numbers), 'astar', self.deadline
+        try:
+            ident = request.get("id", ident)
+            # A reused open id would hide the first job from cancel and
+            # from the cleanup when the connection closes.
+            if ident in jobs and not jobs[ident].done:
+                raise ValueError("id %r is still open" % (ident,))
+            algorithm = request.get("algorithm", algorithm)
+            deadline = float(request.get("deadline") or deadline)
+            game = game_from_json(request["game"])
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            self._finish(Job(ident, None, algorithm, deadline, writer), 'error', error=repr(e))
+            return
+        job = Job(ident, game, algorithm, deadline, writer)
+        if algorithm not in ALGORITHMS:
+            self._finish(job, 'error', error="unknown algorithm %r" % algorithm)
+            return
+        if self.waiting >= self.queue_size:
+            self._finish(job, 'rejected', error="queue full")
+            return
+        self.waiting += 1
+        self.queue.put_nowait(job)
+        # Finished jobs are dropped so a long connection does not pile them up.
+        for old in [key for key, value in jobs.items() if value.done]:
+            del jobs[old]
+        jobs[ident] = job
+        job.reply(status='queued', position=self.waiting)
+
+
+def request(game, algorithm='astar', deadline=None, path=None, port=None):
+    """Solve game through a running service and return its final reply as a
+    dict. A blocking client for programs without an event loop."""
+    if port is not None:
+        conn = socket.create_connection(('127.0.0.1', port))
+    else:
+        conn = socket.socket(socket.AF_UNIX)
+        conn.connect(path or SOCKET_PATH)
+    with conn, conn.makefile('rw') as stream:
+        stream.write(json.dumps({"id": 1, "game": game_to_json(game), "algorithm": algorithm,
+                                 "deadline": deadline}) + "\n")
+        stream.flush()
+        for line in stream:
+            reply = json.loads(line)
+            if reply.get("status") != 'queued':
+                return reply
+    raise ConnectionError("the service closed the connection")
+
+
+async def serve(path=None, port=None, workers=None, queue_size=64):
+    service = SolveService(workers, queue_size)
+    server = await service.start(path, port)
+    print("serving on", port if port is not None else path or SOCKET_PATH,
+          "with", service.size, "workers")
+    sys.stdout.flush()
+    try:
+        await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+    import ex1_check
+    names = [name for name, _, _ in ex1_check.all_problems()]
+    address = argparse.ArgumentParser(add_help=False)
+    where = address.add_mutually_exclusive_group()
+    where.add_argument('--socket', metavar='PATH', help="Unix socket (default: %s)" % SOCKET_PATH)
+    where.add_argument('--port', type=int, help="localhost TCP port instead of a socket")
+    parser = argparse.ArgumentParser(description="A local solve service for watering problems.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', parents=[address], help="run the service")
+    serve_parser.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    serve_parser.add_argument('--queue', type=int, default=64, help="queue size (default: 64)")
+    solve_parser = commands.add_parser('solve', parents=[address],
+                                       help="solve an ex1_check problem through the service")
+    solve_parser.add_argument('name', choices=names)
+    solve_parser.add_argument('algorithm', nargs='?', default='astar', choices=sorted(ALGORITHMS))
+    args = parser.parse_args()
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(args.socket, args.port, args.workers, args.queue))
+        except KeyboardInterrupt:
+            pass
+    else:
+        reply = request(getattr(ex1_check, args.name), args.algorithm,
+                        path=args.socket, port=args.port)
+        print(json.dumps(reply))
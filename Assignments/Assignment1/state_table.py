@@ -0,0 +1,198 @@
+"""A compact closed table for states packed into 64-bit ints.
+
+graph_search keeps every closed state as a tuple in a dict, about 100+
+bytes per state once the tuples are counted. StateTable stores a key, its
+best g and the entry index of its parent in three NumPy arrays, in
+insertion order, and an open-addressing index (linear probing over a
+power-of-two array of entry numbers) to find a key. An entry costs 20
+bytes plus 8 / load factor for the index, and entry numbers never change,
+so they double as parent pointers. With a directory the entry arrays are
+np.memmap files, so the table may grow beyond RAM and let the OS page it.
+
+table_search is A* (uniform-cost without h) over such a table for problems
+with pack(state) -> int and unpack(int) -> state, like WateringProblem:
+the fringe holds (f, g, entry) and no Node or state tuple is kept for
+closed states. The solution path is rebuilt from the parent entries.
+
+Needs numpy."""
+
+import heapq
+import os
+
+import numpy as np
+
+import search
+
+EMPTY = -1
+# Fibonacci hashing: the top bits of key * 2**64 / golden ratio.
+MULTIPLIER = 0x9E3779B97F4A7C15
+MASK64 = (1 << 64) - 1
+
+
+class StateTable:
+    """key -> (best g, parent entry) for int keys below 2 ** 64. The index
+    doubles whenever it would be fuller than max_load; the entry arrays
+    double when they are full. Entries are never removed."""
+
+    def __init__(self, capacity=1 << 10, max_load=0.5, directory=None, g_dtype=np.int32):
+        self.max_load = max_load
+        self.directory = directory
+        self.g_dtype = np.dtype(g_dtype)
+        self.count = 0
+        self.keys = self._array('keys', np.uint64, capacity)
+        self.g = self._array('g', self.g_dtype, capacity)
+        self.parents = self._array('parents', np.int64, capacity)
+        self._index(1 << max(4, int(capacity / max_load - 1).bit_length()))
+
+    def __len__(self):
+        return self.count
+
+    def _array(self, name, dtype, length, old=None):
+        """A new or grown entry array. In memory the old contents are copied;
+        on disk the file is extended and mapped again."""
+        if self.directory is None:
+            array = np.zeros(length, dtype)
+            if old is not None:
+                array[:len(old)] = old
+            return array
+        path = os.path.join(self.directory, name)
+        if old is None:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            return np.memmap(path, dtype, 'w+', shape=(length,))
+        old.flush()
+        del old
+        with open(path, 'r+b') as f:
+            f.truncate(length * np.dtype(dtype).itemsize)
+        return np.memmap(path, dtype, 'r+', shape=(length,))
+
+    def _index(self, size):
+        "Rebuild the open-addressing index with size slots from the entries."
+        self.slots = np.full(size, EMPTY, np.int64)
+        self.shift = 64 - (size.bit_length() - 1)
+        self.mask = size - 1
+        pending = np.arange(self.count, dtype=np.int64)
+        position = self._hash_array(self.keys[:self.count])
+        # Vectorized linear probing: every round places, per free slot, the
+        # first pending entry that wants it; the others move one slot on.
+        while len(pending):
+            free = self.slots[position] == EMPTY
+            wanted, first = np.unique(position[free], return_index=True)
+            winners = np.flatnonzero(free)[first]
+            self.slots[wanted] = pending[winners]
+            placed = np.zeros(len(pending), bool)
+            placed[winners] = True
+            pending = pending[~placed]
+            position = (position[~placed] + 1) & self.mask
+
+    def _hash_array(self, keys):
+        # uint64 multiplication wraps around, which is what the hash wants.
+        return ((keys * np.uint64(MULTIPLIER)) >> np.uint64(self.shift)).astype(np.int64)
+
+    def _find(self, key):
+        "(slot, entry) of key, or (first free slot, EMPTY)."
+        slot = ((key * MULTIPLIER) & MASK64) >> self.shift
+        slots, keys = self.slots, self.keys
+        while True:
+            entry = int(slots[slot])
+            if entry == EMPTY or int(keys[entry]) == key:
+                return slot, entry
+            slot = (slot + 1) & self.mask
+
+    def get(self, key):
+        "The entry of key, or EMPTY."
+        return self._find(key)[1]
+
+    def __contains__(self, key):
+        return self._find(key)[1] != EMPTY
+
+    def insert(self, key, g, parent=EMPTY):
+        """Record key reached with cost g from the entry parent. Returns
+        (entry, True) if key is new or g improves on its best cost, and
+        (entry, False) otherwise, leaving the table unchanged."""
+        slot, entry = self._find(key)
+        if entry != EMPTY:
+            if g < self.g[entry]:
+                self.g[entry] = g
+                self.parents[entry] = parent
+                return entry, True
+            return entry, False
+        if self.count == len(self.keys):
+            size = 2 * len(self.keys)
+            self.keys = self._array('keys', np.uint64, size, self.keys)
+            self.g = self._array('g', self.g_dtype, size, self.g)
+            self.parents = self._array('parents', np.int64, size, self.parents)
+        entry = self.count
+        self.keys[entry] = key
+        self.g[entry] = g
+        self.parents[entry] = parent
+        self.count += 1
+        if self.count > self.max_load * len(self.slots):
+            self._index(2 * len(self.slots))
+        else:
+            self.slots[slot] = entry
+        return entry, True
+
+    def key(self, entry):
+        return int(self.keys[entry])
+
+    def path(self, entry):
+        "The keys from the root entry down to entry."
+        keys = []
+        while entry != EMPTY:
+            keys.append(int(self.keys[entry]))
+            entry = int(self.parents[entry])
+        return keys[::-1]
+
+    def nbytes(self):
+        "Bytes used by the entry arrays and the index."
+        return self.keys.nbytes + self.g.nbytes + self.parents.nbytes + self.slots.nbytes
+
+    def flush(self):
+        "Write memory-mapped entries to disk; a no-op in memory."
+        for array in (self.keys, self.g, self.parents):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+
+def table_search(problem, h=None, table=None):
+    """A* over a StateTable, or uniform-cost search when h is None. problem
+    needs pack and unpack; h is called with a parentless Node. Returns
+    (node, expanded) like graph_search, or None, where node is rebuilt
+    from the table with its actions and path costs."""
+    if problem.key_bits > 64:
+        raise ValueError("states need %d bits, more than a uint64 key holds"
+                         % problem.key_bits)
+    table = table if table is not None else StateTable()
+    estimate = (lambda state: h(search.Node(state))) if h is not None else (lambda state: 0)
+    root, _ = table.insert(problem.pack(problem.initial), 0)
+    fringe = [(estimate(problem.initial), 0, root)]
+    expanded = 0
+    while fringe:
+        f, g, entry = heapq.heappop(fringe)
+        if g > table.g[entry]:
+            continue
+        state = problem.unpack(table.key(entry))
+        if problem.goal_test(state):
+            return _node(problem, table, entry), expanded
+        expanded += 1
+        for action, child in problem.successor(state):
+            cost = problem.path_cost(g, state, action, child)
+            child_entry, improved = table.insert(problem.pack(child), cost, entry)
+            if improved:
+                heapq.heappush(fringe, (max(f, cost + estimate(child)), cost, child_entry))
+    return None
+
+
+def _node(problem, table, entry):
+    """The Node chain of the path to entry. Each action is the first one of
+    the parent state that leads to the child state."""
+    states = [problem.unpack(key) for key in table.path(entry)]
+    node = search.Node(states[0])
+    for child in states[1:]:
+        for action, state in problem.successor(node.state):
+            if state == child:
+                cost = problem.path_cost(node.path_cost, node.state, action, state)
+                node = search.Node(state, node, action, cost)
+                break
+    return node
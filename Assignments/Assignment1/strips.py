@@ -0,0 +1,110 @@
+"""Bitset-compiled STRIPS tasks with a successor generator.
+
+A grounded task (pddl.StripsProblem) is compiled so that every fact is one
+bit of a Python int: a state is an int, and each operator has precondition,
+add and delete masks. Applicable operators are found through a successor
+generator in the style of Fast Downward: a trie over the operators'
+precondition facts, walked only along facts that hold in the state, so an
+expansion never tests operators whose first missing precondition has
+already been ruled out."""
+
+import search
+
+
+class SuccessorGenerator:
+    """A precondition trie. Facts are ordered by how many operators need
+    them, most common first, so operators share long prefixes. A node is
+    (operators whose preconditions end here, mask of the child facts,
+    {fact bit: child node}); a walk masks the state with the child mask and
+    only visits the children whose fact holds."""
+
+    def __init__(self, operators):
+        # operators: (pre_mask, payload) pairs.
+        count = {}
+        for pre, _ in operators:
+            for bit in _bits(pre):
+                count[bit] = count.get(bit, 0) + 1
+        order = dict((bit, (-n, bit)) for bit, n in count.items())
+        root = ([], {})
+        for pre, payload in operators:
+            node = root
+            for bit in sorted(_bits(pre), key=order.get):
+                node = node[1].setdefault(1 << bit, ([], {}))
+            node[0].append(payload)
+        self.root = self._freeze(root)
+
+    def _freeze(self, node):
+        children = dict((bit, self._freeze(child)) for bit, child in node[1].items())
+        mask = 0
+        for bit in children:
+            mask |= bit
+        return (tuple(node[0]), mask, children)
+
+    def applicable(self, state):
+        "Return the payloads of all operators whose preconditions hold in state."
+        result = []
+        stack = [self.root]
+        while stack:
+            payloads, mask, children = stack.pop()
+            result.extend(payloads)
+            hits = state & mask
+            while hits:
+                low = hits & -hits
+                stack.append(children[low])
+                hits ^= low
+        return result
+
+
+class BitsetProblem(search.Problem):
+    """A STRIPS task over int bitset states. self.facts[i] is the fact of
+    bit i; actions are the operator names of the grounded task."""
+
+    def __init__(self, task):
+        self.facts = sorted(task.facts if task.facts is not None else
+                            set(task.initial).union(*[op.add for op in task.operators]))
+        self.bit = dict((fact, i) for i, fact in enumerate(self.facts))
+        self.operators = [(op.name, self.mask(op.pre), self.mask(op.add), self.mask(op.delete))
+                          for op in task.operators]
+        self.generator = SuccessorGenerator([(pre, (name, add, ~delete))
+                                             for name, pre, add, delete in self.operators])
+        goal = task.goal
+        if not goal <= set(self.bit):
+            # An unreachable goal fact gets its own bit that no operator adds.
+            self.facts.extend(sorted(goal - set(self.bit)))
+            self.bit = dict((fact, i) for i, fact in enumerate(self.facts))
+        search.Problem.__init__(self, self.mask(task.initial), self.mask(goal))
+
+    def mask(self, facts):
+        "The bitset of a collection of facts."
+        m = 0
+        for fact in facts:
+            m |= 1 << self.bit[fact]
+        return m
+
+    def decode(self, state):
+        "The set of facts of a bitset state."
+        return frozenset(self.facts[i] for i in _bits(state))
+
+    def successor(self, state):
+        return [(name, (state & keep) | add)
+                for name, add, keep in self.generator.applicable(state)]
+
+    def goal_test(self, state):
+        return state & self.goal == self.goal
+
+    def atoms(self, state):
+        return _bits(state)
+
+    def h_gbfs(self, node):
+        "Goal count: the number of goal facts that do not hold yet."
+        return bin(self.goal & ~node.state).count('1')
+
+
+def _bits(mask):
+    "Return the indices of the set bits of mask, lowest first."
+    result = []
+    while mask:
+        low = mask & -mask
+        result.append(low.bit_length() - 1)
+        mask ^= low
+    return result
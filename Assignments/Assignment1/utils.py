@@ -1,12 +1,14 @@
 """Provide some widely useful utilities. Safe for "from utils import *".
 
+Modules that are slow to import (inspect, random, weakref) are imported by
+the functions that need them, so that importing utils stays cheap.
 """
 
-from __future__ import generators
-import operator, math, random, copy, sys, os.path, bisect, inspect
+import operator, math, copy, sys, os.path, bisect, collections, heapq
 
 
 def raiseNotDefined():
+    import inspect
     fileName = inspect.stack()[1][1]
     line = inspect.stack()[1][2]
     method = inspect.stack()[1][3]
@@ -15,213 +17,6 @@ def raiseNotDefined():
     sys.exit(1)
 
 
-# ______________________________________________________________________________
-# Compatibility with Python 2.2 and 2.3
-
-# The AIMA code is designed to run in Python 2.2 and up (at some point,
-# support for 2.2 may go away; 2.2 was released in 2001, and so is over
-# 3 years old). The first part of this file brings you up to 2.4
-# compatibility if you are running in Python 2.2 or 2.3:
-
-# try: bool, True, False ## Introduced in 2.3
-# except NameError:
-#     class bool(int):
-#         "Simple implementation of Booleans, as in PEP 285"
-#         def __init__(self, val): self.val = val
-#         def __int__(self): return self.val
-#         def __repr__(self): return ('False', 'True')[self.val]
-#
-#     True, False = bool(1), bool(0)
-#
-# try: sum ## Introduced in 2.3
-# except NameError:
-#     def sum(seq, start=0):
-#         """Sum the elements of seq.
-#         >>> sum([1, 2, 3])
-#         6
-#         """
-#         return reduce(operator.add, seq, start)
-
-try:
-    enumerate  ## Introduced in 2.3
-except NameError:
-    def enumerate(collection):
-        """Return an iterator that enumerates pairs of (i, c[i]). PEP 279.
-        >>> list(enumerate('abc'))
-        [(0, 'a'), (1, 'b'), (2, 'c')]
-        """
-        ## Copied from PEP 279
-        i = 0
-        it = iter(collection)
-        while 1:
-            yield (i, it.next())
-            i += 1
-
-try:
-    reversed  ## Introduced in 2.4
-except NameError:
-    def reversed(seq):
-        """Iterate over x in reverse order.
-        >>> list(reversed([1,2,3]))
-        [3, 2, 1]
-        """
-        if hasattr(seq, 'keys'):
-            raise ValueError("mappings do not support reverse iteration")
-        i = len(seq)
-        while i > 0:
-            i -= 1
-            yield seq[i]
-
-try:
-    sorted  ## Introduced in 2.4
-except NameError:
-    def sorted(seq, cmp=None, key=None, reverse=False):
-        """Copy seq and sort and return it.
-        >>> sorted([3, 1, 2])
-        [1, 2, 3]
-        """
-        seq2 = copy.copy(seq)
-        if key:
-            if cmp == None:
-                cmp = __builtins__.cmp
-            seq2.sort(lambda x, y: cmp(key(x), key(y)))
-        else:
-            if cmp == None:
-                seq2.sort()
-            else:
-                seq2.sort(cmp)
-        if reverse:
-            seq2.reverse()
-        return seq2
-
-try:
-    set, frozenset  ## set builtin introduced in 2.4
-except NameError:
-    try:
-        import sets  ## sets module introduced in 2.3
-
-        set, frozenset = sets.Set, sets.ImmutableSet
-    except (NameError, ImportError):
-        class BaseSet:
-            "set type (see http://docs.python.org/lib/types-set.html)"
-
-            def __init__(self, elements=[]):
-                self.dict = {}
-                for e in elements:
-                    self.dict[e] = 1
-
-            def __len__(self):
-                return len(self.dict)
-
-            def __iter__(self):
-                for e in self.dict:
-                    yield e
-
-            def __contains__(self, element):
-                return element in self.dict
-
-            def issubset(self, other):
-                for e in self.dict.keys():
-                    if e not in other:
-                        return False
-                return True
-
-            def issuperset(self, other):
-                for e in other:
-                    if e not in self:
-                        return False
-                return True
-
-            def union(self, other):
-                return type(self)(list(self) + list(other))
-
-            def intersection(self, other):
-                return type(self)([e for e in self.dict if e in other])
-
-            def difference(self, other):
-                return type(self)([e for e in self.dict if e not in other])
-
-            def symmetric_difference(self, other):
-                return type(self)([e for e in self.dict if e not in other] +
-                                  [e for e in other if e not in self.dict])
-
-            def copy(self):
-                return type(self)(self.dict)
-
-            def __repr__(self):
-                elements = ", ".join(map(str, self.dict))
-                return "%s([%s])" % (type(self).__name__, elements)
-
-            __le__ = issubset
-            __ge__ = issuperset
-            __or__ = union
-            __and__ = intersection
-            __sub__ = difference
-            __xor__ = symmetric_difference
-
-
-        class frozenset(BaseSet):
-            "A frozenset is a BaseSet that has a hash value and is immutable."
-
-            def __init__(self, elements=[]):
-                BaseSet.__init__(elements)
-                self.hash = 0
-                for e in self:
-                    self.hash |= hash(e)
-
-            def __hash__(self):
-                return self.hash
-
-
-        class set(BaseSet):
-            "A set is a BaseSet that does not have a hash, but is mutable."
-
-            def update(self, other):
-                for e in other:
-                    self.add(e)
-                return self
-
-            def intersection_update(self, other):
-                for e in self.dict.keys():
-                    if e not in other:
-                        self.remove(e)
-                return self
-
-            def difference_update(self, other):
-                for e in self.dict.keys():
-                    if e in other:
-                        self.remove(e)
-                return self
-
-            def symmetric_difference_update(self, other):
-                to_remove1 = [e for e in self.dict if e in other]
-                to_remove2 = [e for e in other if e in self.dict]
-                self.difference_update(to_remove1)
-                self.difference_update(to_remove2)
-                return self
-
-            def add(self, element):
-                self.dict[element] = 1
-
-            def remove(self, element):
-                del self.dict[element]
-
-            def discard(self, element):
-                if element in self.dict:
-                    del self.dict[element]
-
-            def pop(self):
-                key, val = self.dict.popitem()
-                return key
-
-            def clear(self):
-                self.dict.clear()
-
-            __ior__ = update
-            __iand__ = intersection_update
-            __isub__ = difference_update
-            __ixor__ = symmetric_difference_update
-
 # ______________________________________________________________________________
 # Simple Data Structures: infinity, Dict, Struct
 
@@ -416,6 +211,7 @@ def argmin_list(seq, fn):
 def argmin_random_tie(seq, fn):
     """Return an element with lowest fn(seq[i]) score; break ties at random.
     Thus, for all s,f: argmin_random_tie(s, f) in argmin_list(s, f)"""
+    import random
     best_score = fn(seq[0]);
     n = 0
     for x in seq:
@@ -493,6 +289,7 @@ def median(values):
     >>> median([1, 2, 3, 4])
     2.5
     """
+    import random
     n = len(values)
     values = sorted(values)
     if n % 2 == 1:
@@ -535,6 +332,7 @@ def vector_add(a, b):
 
 def probability(p):
     "Return true with probability p."
+    import random
     return p > random.uniform(0.0, 1.0)
 
 
@@ -622,10 +420,104 @@ def caller(n=1):
     return inspect.getouterframes(inspect.currentframe())[n][3]
 
 
-def memoize(fn, slot=None):
+_missing = object()
+
+
+class MemoCache:
+    """A cache of at most maxsize entries (unbounded if maxsize is None) that
+    counts hits, misses and evictions. With policy 'lru' the least recently
+    used entry is evicted; with 'clock' every entry gets a second chance
+    through a reference bit, so a hit does not have to reorder anything.
+    >>> c = MemoCache(2)
+    >>> c.put('a', 1); c.put('b', 2); c.get('a'); c.put('c', 3)
+    1
+    >>> c.get('b', None), c.info()
+    (None, {'hits': 1, 'misses': 1, 'evictions': 1, 'size': 2, 'maxsize': 2})
+    """
+
+    def __init__(self, maxsize=None, policy='lru'):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be at least 1 or None, not %r" % (maxsize,))
+        if policy not in ('lru', 'clock'):
+            raise ValueError("unknown eviction policy %r" % (policy,))
+        update(self, maxsize=maxsize, policy=policy, hits=0, misses=0,
+               evictions=0, data=collections.OrderedDict(), keys=[], ref=[],
+               slots={}, hand=0)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=_missing):
+        """Return the cached value for key, or default on a miss (KeyError
+        if no default is given)."""
+        try:
+            val = self.data[key]
+        except KeyError:
+            self.misses += 1
+            if default is _missing:
+                raise
+            return default
+        self.hits += 1
+        if self.maxsize is not None:
+            if self.policy == 'lru':
+                self.data.move_to_end(key)
+            else:
+                self.ref[self.slots[key]] = 1
+        return val
+
+    def put(self, key, val):
+        """Store val under key, evicting an entry if the cache is full."""
+        if key in self.data or self.maxsize is None:
+            self.data[key] = val
+            return
+        if len(self.data) >= self.maxsize:
+            self.evictions += 1
+            if self.policy == 'lru':
+                self.data.popitem(last=False)
+            else:
+                while self.ref[self.hand]:
+                    self.ref[self.hand] = 0
+                    self.hand = (self.hand + 1) % self.maxsize
+                old = self.keys[self.hand]
+                del self.data[old], self.slots[old]
+        if self.policy == 'clock':
+            if len(self.keys) < self.maxsize:
+                self.slots[key] = len(self.keys)
+                self.keys.append(key)
+                self.ref.append(1)
+            else:
+                self.slots[key] = self.hand
+                self.keys[self.hand], self.ref[self.hand] = key, 1
+                self.hand = (self.hand + 1) % self.maxsize
+        self.data[key] = val
+
+    def clear(self):
+        self.data.clear()
+        del self.keys[:], self.ref[:]
+        self.slots.clear()
+        self.hand = 0
+
+    def info(self):
+        "Return the hit, miss and eviction counters and the current size."
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'size': len(self.data),
+                'maxsize': self.maxsize}
+
+
+def memoize(fn, slot=None, maxsize=None, policy='lru', key=None):
     """Memoize fn: make it remember the computed value for any argument list.
     If slot is specified, store result in that slot of first argument.
-    If slot is false, store results in a dictionary."""
+    If slot is false, store results in a MemoCache of at most maxsize
+    entries, keyed by key(*args) if key is given and by the argument tuple
+    otherwise. A key such as lambda node: node.state shares one entry among
+    all the nodes that reach the same state.
+    >>> sq = memoize(lambda x: x * x, maxsize=2)
+    >>> sq(3), sq(3), sq.cache_info()['hits']
+    (9, 9, 1)
+    """
     if slot:
         def memoized_fn(obj, *args):
             if hasattr(obj, slot):
@@ -635,12 +527,67 @@ def memoize(fn, slot=None):
                 setattr(obj, slot, val)
                 return val
     else:
+        cache = MemoCache(maxsize, policy)
+
         def memoized_fn(*args):
-            if not memoized_fn.cache.has_key(args):
-                memoized_fn.cache[args] = fn(*args)
-            return memoized_fn.cache[args]
+            k = key(*args) if key else args
+            try:
+                return cache.get(k)
+            except KeyError:
+                val = fn(*args)
+                cache.put(k, val)
+                return val
 
-        memoized_fn.cache = {}
+        memoized_fn.cache = cache
+        memoized_fn.cache_info = cache.info
+    return memoized_fn
+
+
+def weak_memoize(fn):
+    """Memoize fn on the identity of its first argument, e.g. a search Node,
+    holding the object only through a weak reference. An entry goes away
+    with its object, so per-Node values neither outlive the search nor need
+    an attribute on the Node. Counters are available through cache_info().
+    peek(obj, default) returns the cached value of obj without computing
+    it and forget(obj) drops it early. Objects that cannot be weakly
+    referenced are computed but not cached."""
+    import weakref
+    cache = {}
+    stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def forget(ref, oid=None):
+        stats['evictions'] += 1
+        cache.pop(oid, None)
+
+    def memoized_fn(obj, *args):
+        oid = id(obj)
+        entry = cache.get(oid)
+        if entry is not None and entry[0]() is obj:
+            stats['hits'] += 1
+            return entry[1]
+        stats['misses'] += 1
+        val = fn(obj, *args)
+        try:
+            ref = weakref.ref(obj, lambda r, oid=oid: forget(r, oid))
+        except TypeError:
+            return val
+        cache[oid] = (ref, val)
+        return val
+
+    def peek(obj, default=None):
+        entry = cache.get(id(obj))
+        return entry[1] if entry is not None and entry[0]() is obj else default
+
+    def forget_obj(obj):
+        entry = cache.get(id(obj))
+        if entry is not None and entry[0]() is obj:
+            # The dropped weakref dies with the entry, so no callback fires.
+            del cache[id(obj)]
+
+    memoized_fn.cache = cache
+    memoized_fn.cache_info = lambda: dict(stats, size=len(cache), maxsize=None)
+    memoized_fn.peek = peek
+    memoized_fn.forget = forget_obj
     return memoized_fn
 
 
@@ -737,28 +684,22 @@ def Stack():
 
 
 class FIFOQueue(Queue):
-    """A First-In-First-Out Queue."""
+    """A First-In-First-Out Queue, backed by a collections.deque."""
 
     def __init__(self):
-        self.A = [];
-        self.start = 0
+        self.A = collections.deque()
 
     def append(self, item):
         self.A.append(item)
 
     def __len__(self):
-        return len(self.A) - self.start
+        return len(self.A)
 
     def extend(self, items):
         self.A.extend(items)
 
     def pop(self):
-        e = self.A[self.start]
-        self.start += 1
-        if self.start > 5 and self.start > len(self.A) / 2:
-            self.A = self.A[self.start:]
-            self.start = 0
-        return e
+        return self.A.popleft()
 
 
 class PriorityQueue(Queue):
@@ -782,6 +723,80 @@ class PriorityQueue(Queue):
             return self.A.pop()[1]
 
 
+class BucketQueue(Queue):
+    """A min-priority queue on f(item) with a bucket per distinct f value,
+    for searches whose f values are small integers with large plateaus.
+    A heap holds only the distinct values; the order among items of equal
+    f is set by tie:
+        'fifo'    first in, first out within the layer
+        'lifo'    last in, first out within the layer
+        'random'  uniformly at random, from random.Random(seed)
+        'high_g'  highest item.path_cost first, FIFO among equal g
+        'low_h'   lowest f - path_cost first (h, if f = g + h)
+    or a function key, smallest key first. Within an A* f-layer high_g and
+    low_h give the same order; they differ when f is not g + h."""
+
+    KEYS = {'high_g': lambda node: -node.path_cost,
+            'low_h': lambda node: node.f - node.path_cost}
+
+    def __init__(self, f=lambda x: x, tie='fifo', seed=None):
+        self.f = f
+        self.tie = tie
+        self.key = tie if callable(tie) else self.KEYS.get(tie)
+        if self.key is None and tie not in ('fifo', 'lifo', 'random'):
+            raise ValueError("unknown tie-breaking policy %r" % (tie,))
+        if tie == 'random':
+            import random
+            self.random = random.Random(seed)
+        self.buckets = {}
+        self.values = []
+        self.count = 0
+
+    def append(self, item):
+        value = self.f(item)
+        layer = self.buckets.get(value)
+        if layer is None:
+            if self.key is not None:
+                layer = BucketQueue(self.key, 'fifo')
+            elif self.tie == 'fifo':
+                layer = collections.deque()
+            else:
+                layer = []
+            self.buckets[value] = layer
+            heapq.heappush(self.values, value)
+        layer.append(item)
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def pop(self):
+        value = self.values[0]
+        layer = self.buckets[value]
+        if self.tie == 'fifo':
+            item = layer.popleft()
+        elif self.tie == 'random':
+            i = self.random.randrange(len(layer))
+            layer[i], layer[-1] = layer[-1], layer[i]
+            item = layer.pop()
+        else:
+            item = layer.pop()
+        if not layer:
+            del self.buckets[value]
+            heapq.heappop(self.values)
+        self.count -= 1
+        return item
+
+    def items(self):
+        """All items, layer by layer. Appending them in this order to an
+        empty queue with the same f and tie rebuilds the same layers."""
+        result = []
+        for value in sorted(self.buckets):
+            layer = self.buckets[value]
+            result.extend(layer.items() if isinstance(layer, BucketQueue) else layer)
+        return result
+
+
 ## Fig: The idea is we can define things like Fig[3,10] later.
 ## Alas, it is Fig[3,10] not Fig[3.10], because that would be the same as Fig[3.1]
 Fig = {}
@@ -0,0 +1,174 @@
+"""Frontier-batched breadth-first search for the watering domain.
+
+breadth_first_graph_search expands one Node at a time. vector_bfs keeps a
+whole BFS layer as one NumPy array of states, one row per state in the
+digit layout of WateringProblem.pack (cell and load per robot, then the
+water of every tap and plant), and generates all successors of the layer
+with array operations:
+
+  * a move is a lookup in the neighbour table of the robot cells (-1 for
+    walls and borders) and a comparison with the other robots' cells;
+  * LOAD and POUR are masked decrements of the tap or plant under the
+    robot and an increment or decrement of its load.
+
+Children are packed into int64 keys with one dot product, deduplicated with
+np.unique, and compared with the sorted array of visited keys through
+np.searchsorted. Every layer keeps only (parent row, action code) per
+state, which is enough to rebuild the plan. Like breadth_first_graph_search
+the goal test happens when a layer is generated, so plans are optimal.
+bench_vector_bfs.py compares both.
+
+Needs numpy."""
+
+import numpy as np
+
+import ex1
+import search
+
+# Action codes per robot: the four MOVES, then LOAD and POUR.
+ACTIONS = tuple(name for name, _, _ in ex1.MOVES) + ("LOAD", "POUR")
+
+
+class VectorWatering:
+    """The array tables of one WateringProblem: neighbour cells, the tap and
+    plant index per cell and the weights that pack a state row."""
+
+    def __init__(self, problem):
+        if problem.key_bits > 63:
+            raise ValueError("states need %d bits, more than an int64 key holds"
+                             % problem.key_bits)
+        self.problem = problem
+        rows, cols = problem.size
+        self.robots = len(problem.robot_ids)
+        self.taps = len(problem.tap_cells)
+        self.plants = len(problem.plant_cells)
+        self.neighbours = np.full((rows * cols, len(ex1.MOVES)), -1, np.int64)
+        for r in range(rows):
+            for c in range(cols):
+                for m, (_, dr, dc) in enumerate(ex1.MOVES):
+                    cell = (r + dr, c + dc)
+                    if (0 <= cell[0] < rows and 0 <= cell[1] < cols
+                            and cell not in problem.walls):
+                        self.neighbours[r * cols + c, m] = cell[0] * cols + cell[1]
+        self.tap_of = np.full(rows * cols, -1, np.int64)
+        for t, (r, c) in enumerate(problem.tap_cells):
+            self.tap_of[r * cols + c] = t
+        self.plant_of = np.full(rows * cols, -1, np.int64)
+        for p, (r, c) in enumerate(problem.plant_cells):
+            self.plant_of[r * cols + c] = p
+        self.capacity = np.array(problem.capacity, np.int64)
+        weights = [1]
+        for base in reversed(problem.radix[1:]):
+            weights.append(weights[-1] * base)
+        self.weights = np.array(weights[::-1], np.int64)
+
+    def row(self, state):
+        "The digit row of a state tuple."
+        robots, taps, plants = state
+        cols = self.problem.size[1]
+        digits = []
+        for r, c, load in robots:
+            digits += [r * cols + c, load]
+        return np.array(digits + list(taps) + list(plants), np.int64)
+
+    def goal(self, layer):
+        "A boolean mask of the rows whose plants are all watered."
+        return ~layer[:, 2 * self.robots + self.taps:].any(axis=1)
+
+    def expand(self, layer):
+        """All successors of the rows of layer, as (children, parent rows,
+        action codes). Code 6 * i + a is ACTIONS[a] of robot i. Rows that
+        cannot finish with the water left have no successors, as in
+        WateringProblem.successor."""
+        n_robots, first_tap = self.robots, 2 * self.robots
+        first_plant = first_tap + self.taps
+        cells, loads = layer[:, 0:first_tap:2], layer[:, 1:first_tap:2]
+        water = layer[:, first_tap:first_plant].sum(axis=1) + loads.sum(axis=1)
+        alive = np.flatnonzero(water >= layer[:, first_plant:].sum(axis=1))
+        layer, cells, loads = layer[alive], cells[alive], loads[alive]
+        rows = np.arange(len(layer))
+        children, parents, codes = [], [], []
+
+        def emit(selected, child, code):
+            children.append(child)
+            parents.append(alive[selected])
+            codes.append(np.full(len(selected), code, np.int8))
+
+        for i in range(n_robots):
+            for m in range(len(ex1.MOVES)):
+                target = self.neighbours[cells[:, i], m]
+                ok = target >= 0
+                for j in range(n_robots):
+                    if j != i:
+                        ok &= target != cells[:, j]
+                selected = np.flatnonzero(ok)
+                child = layer[selected]
+                child[:, 2 * i] = target[selected]
+                emit(selected, child, 6 * i + m)
+            if self.taps:
+                tap = self.tap_of[cells[:, i]]
+                column = first_tap + np.maximum(tap, 0)
+                ok = (tap >= 0) & (layer[rows, column] > 0) & (loads[:, i] < self.capacity[i])
+                selected = np.flatnonzero(ok)
+                child = layer[selected]
+                child[:, 2 * i + 1] += 1
+                child[np.arange(len(selected)), column[selected]] -= 1
+                emit(selected, child, 6 * i + 4)
+            if self.plants:
+                plant = self.plant_of[cells[:, i]]
+                column = first_plant + np.maximum(plant, 0)
+                ok = (plant >= 0) & (layer[rows, column] > 0) & (loads[:, i] > 0)
+                selected = np.flatnonzero(ok)
+                child = layer[selected]
+                child[:, 2 * i + 1] -= 1
+                child[np.arange(len(selected)), column[selected]] -= 1
+                emit(selected, child, 6 * i + 5)
+        if not children:
+            return (np.empty((0, layer.shape[1]), np.int64), np.empty(0, np.int64),
+                    np.empty(0, np.int8))
+        return np.concatenate(children), np.concatenate(parents), np.concatenate(codes)
+
+
+def vector_bfs(problem):
+    """Breadth-first search over whole layers. Returns (node, expanded) like
+    breadth_first_graph_search, or None; node is rebuilt by replaying the
+    actions, and expanded counts every state of the expanded layers."""
+    tables = VectorWatering(problem)
+    node = search.Node(problem.initial)
+    if problem.goal_test(node.state):
+        return node, 0
+    layer = tables.row(problem.initial)[None, :]
+    visited = layer @ tables.weights
+    history = []
+    expanded = 0
+    while len(layer):
+        expanded += len(layer)
+        children, parents, codes = tables.expand(layer)
+        keys, first = np.unique(children @ tables.weights, return_index=True)
+        position = np.searchsorted(visited, keys)
+        seen = visited[np.minimum(position, len(visited) - 1)] == keys
+        fresh = first[~seen]
+        layer = children[fresh]
+        history.append((parents[fresh], codes[fresh]))
+        goals = np.flatnonzero(tables.goal(layer))
+        if len(goals):
+            return _node(problem, history, int(goals[0])), expanded
+        # Both arrays are sorted, so a merge would do; np.sort of the
+        # concatenation is close enough and keeps this short.
+        visited = np.sort(np.concatenate((visited, keys[~seen])))
+    return None
+
+
+def _node(problem, history, row):
+    "Follow the parent rows back from row of the last layer and replay."
+    actions = []
+    for parents, codes in reversed(history):
+        code = int(codes[row])
+        actions.append("%s{%d}" % (ACTIONS[code % 6], problem.robot_ids[code // 6]))
+        row = int(parents[row])
+    node = search.Node(problem.initial)
+    for action in reversed(actions):
+        state = dict(problem.successor(node.state))[action]
+        node = search.Node(state, node, action,
+                           problem.path_cost(node.path_cost, node.state, action, state))
+    return node
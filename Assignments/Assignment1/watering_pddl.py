@@ -0,0 +1,130 @@
+"""Export watering games to PDDL so they run through the grounding pipeline.
+
+The watering domain is numeric: loads, tap water and plant needs are
+counts. The exporter unrolls them into level objects l0, l1, ... linked by
+(next ?l ?l+1) facts, so the task stays within :strips and :typing and can
+be parsed and grounded by pddl.py. Robot r stands on cell cR_C; a cell with
+no robot on it is (free ...), which replaces the collision check of
+WateringProblem. A plant is watered when its need is at l0.
+
+    domain, problem = watering_pddl.export(ex1_check.problem1)
+    task = watering_pddl.ground(ex1_check.problem1)
+    h = relaxation.RelaxedHeuristics(task)
+    node, expanded = search.astar_search(task, h.h_lmcut)
+    plan = watering_pddl.to_plan([n.action for n in node.path()[::-1]][1:])
+"""
+
+import pddl
+
+DOMAIN = """\
+(define (domain watering)
+  (:requirements :strips :typing)
+  (:types robot cell level)
+  (:predicates
+    (at ?r - robot ?c - cell) (free ?c - cell)
+    (up ?from ?to - cell) (down ?from ?to - cell)
+    (left ?from ?to - cell) (right ?from ?to - cell)
+    (load ?r - robot ?l - level) (fits ?r - robot ?l - level)
+    (next ?lo ?hi - level)
+    (tap ?c - cell ?l - level) (plant ?c - cell ?l - level))
+%s
+  ;; LOAD: take one unit from the tap into the robot, up to its capacity
+  (:action load
+    :parameters (?r - robot ?c - cell ?t0 ?t1 ?l0 ?l1 - level)
+    :precondition (and (at ?r ?c) (tap ?c ?t1) (next ?t0 ?t1)
+                       (load ?r ?l0) (next ?l0 ?l1) (fits ?r ?l1))
+    :effect (and (tap ?c ?t0) (load ?r ?l1)
+                 (not (tap ?c ?t1)) (not (load ?r ?l0))))
+
+  ;; POUR: give one unit from the robot to the plant
+  (:action pour
+    :parameters (?r - robot ?c - cell ?p0 ?p1 ?l0 ?l1 - level)
+    :precondition (and (at ?r ?c) (plant ?c ?p1) (next ?p0 ?p1)
+                       (load ?r ?l1) (next ?l0 ?l1))
+    :effect (and (plant ?c ?p0) (load ?r ?l0)
+                 (not (plant ?c ?p1)) (not (load ?r ?l1)))))
+"""
+
+MOVE = """
+  (:action move-%(pred)s
+    :parameters (?r - robot ?from ?to - cell)
+    :precondition (and (at ?r ?from) (free ?to) (%(pred)s ?from ?to))
+    :effect (and (at ?r ?to) (free ?from)
+                 (not (at ?r ?from)) (not (free ?to))))
+"""
+
+# PDDL move action and direction predicate for each ex1.MOVES entry.
+DIRECTIONS = (("UP", "up", -1, 0), ("DOWN", "down", 1, 0),
+              ("LEFT", "left", 0, -1), ("RIGHT", "right", 0, 1))
+
+
+def domain_pddl():
+    "The text of the watering PDDL domain; it does not depend on the game."
+    return DOMAIN % "".join(MOVE % {"pred": pred} for _, pred, _, _ in DIRECTIONS)
+
+
+def problem_pddl(game, name="watering"):
+    "The text of the PDDL problem for an ex1_check-style game dict."
+    rows, cols = game["Size"]
+    walls = set(game["Walls"])
+    cells = [(r, c) for r in range(rows) for c in range(cols) if (r, c) not in walls]
+    robots = game["Robots"]
+    top = max([0] + list(game["Taps"].values()) + list(game["Plants"].values()) +
+              [max(load, capacity) for _, _, load, capacity in robots.values()])
+    cell = lambda rc: "c%d_%d" % rc
+    level = lambda n: "l%d" % n
+    init = ["(next %s %s)" % (level(n), level(n + 1)) for n in range(top)]
+    occupied = set((r, c) for r, c, _, _ in robots.values())
+    for r, c in cells:
+        if (r, c) not in occupied:
+            init.append("(free %s)" % cell((r, c)))
+        for _, pred, dr, dc in DIRECTIONS:
+            if (r + dr, c + dc) in cells:
+                init.append("(%s %s %s)" % (pred, cell((r, c)), cell((r + dr, c + dc))))
+    for rid, (r, c, load, capacity) in sorted(robots.items()):
+        init.append("(at r%d %s)" % (rid, cell((r, c))))
+        init.append("(load r%d %s)" % (rid, level(load)))
+        init.extend("(fits r%d %s)" % (rid, level(n)) for n in range(capacity + 1))
+    for rc, water in sorted(game["Taps"].items()):
+        init.append("(tap %s %s)" % (cell(rc), level(water)))
+    for rc, need in sorted(game["Plants"].items()):
+        init.append("(plant %s %s)" % (cell(rc), level(need)))
+    goal = ["(plant %s l0)" % cell(rc) for rc in sorted(game["Plants"])]
+    return "\n".join([
+        "(define (problem %s)" % name,
+        "  (:domain watering)",
+        "  (:objects %s - robot" % " ".join("r%d" % rid for rid in sorted(robots)),
+        "            %s - cell" % " ".join(map(cell, cells)),
+        "            %s - level)" % " ".join(level(n) for n in range(top + 1)),
+        "  (:init",
+        "\n".join("    " + fact for fact in init) + ")",
+        "  (:goal (and %s)))" % " ".join(goal),
+        ""])
+
+
+def export(game, name="watering"):
+    "Return (domain text, problem text) for game."
+    return domain_pddl(), problem_pddl(game, name)
+
+
+def ground(game, bitset=True):
+    """Parse and ground the PDDL export of game, like pddl.load; with bitset
+    the result is a strips.BitsetProblem."""
+    problem = pddl.ground(pddl.parse_domain(domain_pddl()),
+                          pddl.parse_problem(problem_pddl(game)))
+    if bitset:
+        import strips
+        problem = strips.BitsetProblem(problem)
+    return problem
+
+
+def to_plan(steps):
+    """Translate grounded operator names such as '(move-up r10 c1_0 c0_0)'
+    back into the action strings of ex1, e.g. 'UP{10}'."""
+    names = dict(("move-" + pred, action) for action, pred, _, _ in DIRECTIONS)
+    names.update(load="LOAD", pour="POUR")
+    plan = []
+    for step in steps:
+        parts = step.strip("()").split()
+        plan.append("%s{%s}" % (names[parts[0]], parts[1][1:]))
+    return plan